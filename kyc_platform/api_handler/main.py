@@ -4,6 +4,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 
 from kyc_platform.api_handler.routes.documents import router as documents_router
+from kyc_platform.shared.config import config
 from kyc_platform.shared.logging import get_logger
 
 logger = get_logger(__name__)
@@ -67,4 +68,12 @@ handler = Mangum(app)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=5000)
+    
+    # loop/http default to "auto", which already picks uvloop and httptools
+    # when they are installed; Lambda goes through Mangum instead.
+    uvicorn.run(
+        "kyc_platform.api_handler.main:app",
+        host="0.0.0.0",
+        port=5000,
+        workers=config.API_WORKERS,
+    )
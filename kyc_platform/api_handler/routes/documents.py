@@ -1,8 +1,9 @@
-import base64
-import json
+import asyncio
 import os
 import time
-from fastapi import APIRouter, HTTPException
+from typing import Any, Optional
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 
 from kyc_platform.api_handler.schemas import (
     DocumentUploadRequest,
@@ -13,38 +14,35 @@ from kyc_platform.api_handler.schemas import (
     ProcessingStatus,
 )
 from kyc_platform.api_handler.services.id_generator import generate_document_id, generate_verification_id
-from kyc_platform.api_handler.services.idempotency import generate_idempotency_key
+from kyc_platform.api_handler.services.idempotency import build_idempotency_key, new_image_hasher
+from kyc_platform.api_handler.services.image_store import ImageTooLargeError, check_base64_image, hash_and_persist
 from kyc_platform.api_handler.services.enqueue import enqueue_service
-from kyc_platform.contracts.models import DocumentRecord
-from kyc_platform.persistence import get_repository
+from kyc_platform.contracts.models import DocumentRecord, DocumentStatus
+from kyc_platform.persistence import DocumentRepository, get_repository
+from kyc_platform.shared.clock import utc_now_iso
 from kyc_platform.shared.config import config
 from kyc_platform.shared.logging import get_logger
 
 logger = get_logger(__name__)
 router = APIRouter()
 
+# DocumentStatus (persistence) and ProcessingStatus (API) share values.
+STATUS_TO_API = {status: ProcessingStatus(status.value) for status in DocumentStatus}
 
-def save_image(image_base64: str, document_id: str) -> str:
-    os.makedirs(config.UPLOAD_DIR, exist_ok=True)
-    
-    try:
-        image_data = base64.b64decode(image_base64)
-    except Exception:
-        raise ValueError("Invalid base64 image")
-    
-    filename = f"{document_id}.jpg"
-    filepath = os.path.join(config.UPLOAD_DIR, filename)
-    
-    with open(filepath, "wb") as f:
-        f.write(image_data)
-    
-    return filepath
+# Batch items stored at once; each holds a decode and file write (up to
+# MAX_IMAGE_B64_LEN of base64) on the threadpool.
+BATCH_STORE_CONCURRENCY = 4
+
+TERMINAL_STATUSES = frozenset({ProcessingStatus.EXTRACTED.value, ProcessingStatus.FAILED.value})
+# Terminal payloads carry extracted PII: cacheable by the client only, never
+# by shared proxies or CDNs.
+TERMINAL_CACHE_CONTROL = "private, max-age=300"
 
 
 @router.post(
     "/documents",
     response_model=DocumentUploadResponse,
-    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={400: {"model": ErrorResponse}, 413: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
     summary="Upload document for OCR processing",
     description="""
 Upload an identity document image for OCR extraction.
@@ -71,97 +69,260 @@ Duplicate requests (same client_id + document_type + image) return the existing
 async def upload_document(request: DocumentUploadRequest):
     repository = get_repository()
     
-    base_idempotency_key = generate_idempotency_key(
-        request.client_id,
-        request.document_type,
-        request.image,
+    record, duplicate_response = await _store_upload(request, repository)
+    if duplicate_response:
+        return duplicate_response
+    
+    success = await run_in_threadpool(
+        enqueue_service.enqueue_document_uploaded,
+        **_enqueue_kwargs(record, request),
     )
     
-    if not request.force_reprocess:
-        existing = repository.get_by_idempotency_key(base_idempotency_key)
-        if existing:
-            logger.info(
-                "Duplicate request detected, returning existing document",
-                extra={
-                    "document_id": existing.document_id,
-                    "idempotency_key": base_idempotency_key[:16] + "...",
-                },
-            )
-            return DocumentUploadResponse(
-                ok=True,
-                document_id=existing.document_id,
-                verification_id=existing.verification_id,
-                status=ProcessingStatus(existing.status.value),
-            )
-        idempotency_key = base_idempotency_key
-    else:
-        idempotency_key = f"{base_idempotency_key}_{int(time.time() * 1000)}"
-        logger.info(
-            "Force reprocess requested, generating unique idempotency key",
-            extra={"idempotency_key": idempotency_key[:16] + "..."},
+    if not success:
+        raise HTTPException(status_code=500, detail="Failed to enqueue document for processing")
+    
+    record.mark_queued()
+    await run_in_threadpool(repository.update, record)
+    
+    return DocumentUploadResponse(
+        ok=True,
+        document_id=record.document_id,
+        verification_id=record.verification_id,
+        status=ProcessingStatus.QUEUED,
+    )
+
+
+@router.post(
+    "/documents/batch",
+    response_model=list[DocumentUploadResponse],
+    responses={400: {"model": ErrorResponse}, 413: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    summary="Upload several documents for OCR processing",
+    description="""
+Upload a list of identity document images in a single request, e.g. the
+front and back of a DNI or a multi-document verification session.
+
+Each item accepts the same fields and idempotency rules as `POST /documents`.
+Responses are returned in the same order as the request items.
+
+The batch is all-or-nothing: if any item is rejected, documents already
+stored for this batch are removed so the whole batch can be retried. At most
+`MAX_BATCH_SIZE` items are accepted.
+
+New documents are enqueued together, grouped by target queue, so the queue
+backend receives one batched publish per group instead of one per document.
+    """,
+)
+async def upload_documents_batch(uploads: list[DocumentUploadRequest]):
+    repository = get_repository()
+    
+    if len(uploads) > config.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {config.MAX_BATCH_SIZE} documents)",
         )
     
-    document_id = generate_document_id()
-    verification_id = generate_verification_id()
+    # Reject malformed items before storing anything, so a bad item cannot
+    # leave the others behind as pending documents that are never enqueued.
+    for request in uploads:
+        _check_image(request.image)
     
-    logger.info(
-        "Received document upload request",
-        extra={
-            "document_id": document_id,
-            "document_type": request.document_type.value,
-            "client_id": request.client_id,
-        },
+    responses: list[Optional[DocumentUploadResponse]] = []
+    pending: list[tuple[int, DocumentRecord, DocumentUploadRequest]] = []
+    
+    # Image writes and SQLite inserts run in the threadpool, so storing the
+    # items concurrently overlaps their disk I/O instead of serialising it.
+    # return_exceptions lets every item settle before any rollback.
+    limit = asyncio.Semaphore(BATCH_STORE_CONCURRENCY)
+    
+    async def store(request: DocumentUploadRequest):
+        async with limit:
+            return await _store_upload(request, repository)
+    
+    stored = await asyncio.gather(
+        *(store(request) for request in uploads),
+        return_exceptions=True,
     )
     
+    errors = [result for result in stored if isinstance(result, BaseException)]
+    if errors:
+        # Items that only fail on decode or save: drop what the batch created
+        # so a retry stores it again instead of finding pending duplicates.
+        created = [
+            result[0] for result in stored
+            if not isinstance(result, BaseException) and result[0]
+        ]
+        await asyncio.gather(
+            *(run_in_threadpool(_discard_upload, record, repository) for record in created)
+        )
+        raise errors[0]
+    
+    for request, (record, duplicate_response) in zip(uploads, stored):
+        if duplicate_response:
+            responses.append(duplicate_response)
+        else:
+            pending.append((len(responses), record, request))
+            responses.append(None)
+    
+    results = await run_in_threadpool(
+        enqueue_service.enqueue_documents_uploaded,
+        [_enqueue_kwargs(record, request) for _, record, request in pending],
+    )
+    
+    queued: list[DocumentRecord] = []
+    unpublished: list[DocumentRecord] = []
+    now = utc_now_iso()
+    for (index, record, _), success in zip(pending, results):
+        if not success:
+            unpublished.append(record)
+            continue
+        record.mark_queued(now)
+        queued.append(record)
+        responses[index] = DocumentUploadResponse(
+            ok=True,
+            document_id=record.document_id,
+            verification_id=record.verification_id,
+            status=ProcessingStatus.QUEUED,
+        )
+    await run_in_threadpool(repository.update_many, queued)
+    
+    if unpublished:
+        # Never published: drop them so a retry stores and enqueues them
+        # again instead of deduplicating to a document stuck in pending.
+        await asyncio.gather(
+            *(run_in_threadpool(_discard_upload, record, repository) for record in unpublished)
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to enqueue {len(unpublished)} document(s) for processing",
+        )
+    
+    return responses
+
+
+def _check_image(image: str) -> None:
     try:
-        image_ref = save_image(request.image, document_id)
+        check_base64_image(image)
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _discard_upload(record: DocumentRecord, repository: DocumentRepository) -> None:
+    repository.delete(record.document_id)
+    try:
+        os.remove(record.image_ref)
+    except FileNotFoundError:
+        pass
+
+
+async def _store_upload(
+    request: DocumentUploadRequest,
+    repository: DocumentRepository,
+) -> tuple[Optional[DocumentRecord], Optional[DocumentUploadResponse]]:
+    """
+    Persist the image and a pending DocumentRecord for an upload.
+    
+    Returns (record, None) for a new document, or (None, response) when the
+    idempotency key matches an existing document.
+    """
+    # Reject oversize or malformed payloads before paying for a threadpool
+    # hop and decode.
+    _check_image(request.image)
+    
+    document_id = generate_document_id()
+    verification_id = generate_verification_id()
+    
+    try:
+        image_ref, image_hash = await run_in_threadpool(
+            hash_and_persist, request.image, document_id, new_image_hasher()
+        )
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to save image: {e}")
         raise HTTPException(status_code=500, detail="Failed to save image")
     
-    record = DocumentRecord(
-        document_id=document_id,
-        verification_id=verification_id,
-        client_id=request.client_id,
-        document_type=request.document_type,
-        image_ref=image_ref,
-        idempotency_key=idempotency_key,
+    base_idempotency_key = build_idempotency_key(
+        request.client_id,
+        request.document_type,
+        image_hash,
     )
     
-    if not repository.save(record):
-        raise HTTPException(status_code=500, detail="Failed to save document record")
+    if request.force_reprocess:
+        idempotency_key = f"{base_idempotency_key}_{int(time.time() * 1000)}"
+        logger.info(
+            "Force reprocess requested, generating unique idempotency key",
+            extra={"idempotency_key": idempotency_key[:16] + "..."},
+        )
+    else:
+        idempotency_key = base_idempotency_key
     
-    success = enqueue_service.enqueue_document_uploaded(
+    record = DocumentRecord(
         document_id=document_id,
         verification_id=verification_id,
         client_id=request.client_id,
         document_type=request.document_type,
         image_ref=image_ref,
-        check_authenticity=request.check_authenticity,
-        check_document_liveness=request.check_document_liveness,
-        frames=request.frames,
+        idempotency_key=idempotency_key,
     )
     
-    if not success:
-        raise HTTPException(status_code=500, detail="Failed to enqueue document for processing")
+    # Duplicate check and insert are one conditional INSERT, so concurrent
+    # uploads of the same image cannot both create a document.
+    try:
+        existing = await run_in_threadpool(repository.save_if_new, record)
+    except Exception as e:
+        logger.error(f"Failed to save document record: {e}")
+        raise HTTPException(status_code=500, detail="Failed to save document record")
     
-    record.mark_queued()
-    repository.update(record)
+    if existing:
+        logger.info(
+            "Duplicate request detected, returning existing document",
+            extra={
+                "document_id": existing.document_id,
+                "idempotency_key": idempotency_key[:16] + "...",
+            },
+        )
+        await run_in_threadpool(os.remove, image_ref)
+        return None, DocumentUploadResponse(
+            ok=True,
+            document_id=existing.document_id,
+            verification_id=existing.verification_id,
+            status=STATUS_TO_API[existing.status],
+        )
     
-    return DocumentUploadResponse(
-        ok=True,
-        document_id=document_id,
-        verification_id=verification_id,
-        status=ProcessingStatus.QUEUED,
+    logger.info(
+        "Received document upload request",
+        extra={
+            "document_id": document_id,
+            "document_type": request.document_type.value,
+            "client_id": request.client_id,
+        },
     )
+    
+    return record, None
+
+
+def _enqueue_kwargs(record: DocumentRecord, request: DocumentUploadRequest) -> dict[str, Any]:
+    return {
+        "document_id": record.document_id,
+        "verification_id": record.verification_id,
+        "client_id": record.client_id,
+        "document_type": record.document_type,
+        "image_ref": record.image_ref,
+        "check_authenticity": request.check_authenticity,
+        "check_document_liveness": request.check_document_liveness,
+        "frames": request.frames,
+        "idempotency_key": record.idempotency_key,
+    }
 
 
 @router.get(
     "/documents/{document_id}",
     response_model=DocumentStatusResponse,
-    responses={404: {"model": ErrorResponse}},
+    responses={304: {"description": "Not modified (If-None-Match matched the current ETag)"}, 404: {"model": ErrorResponse}},
     summary="Get document processing status",
     description="""
 Retrieve the current processing status and extracted data for a document.
@@ -172,25 +333,33 @@ Retrieve the current processing status and extracted data for a document.
 - `processing`: OCR extraction in progress
 - `extracted`: Extraction completed successfully (extracted_data available)
 - `failed`: Extraction failed (see errors field)
+
+**Caching:**
+Every response carries an `ETag`; send it back in `If-None-Match` to get a
+`304 Not Modified` while the document is unchanged. Responses for terminal
+statuses (`extracted`, `failed`) never change and are marked privately
+cacheable (client only, never shared caches).
     """,
 )
-async def get_document_status(document_id: str):
+async def get_document_status(document_id: str, request: Request, response: Response):
     repository = get_repository()
-    record = repository.get_by_id(document_id)
+    projection = await run_in_threadpool(repository.get_status_projection, document_id)
     
-    if not record:
+    if not projection:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    return DocumentStatusResponse(
-        document_id=record.document_id,
-        verification_id=record.verification_id,
-        document_type=record.document_type,
-        status=ProcessingStatus(record.status.value),
-        extracted_data=record.extracted_data,
-        confidence=record.confidence,
-        processing_time_ms=record.processing_time_ms,
-        errors=record.errors,
-    )
+    etag = f'W/"{projection["updated_at"]}-{projection["status"]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": TERMINAL_CACHE_CONTROL if projection["status"] in TERMINAL_STATUSES else "no-cache",
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return DocumentStatusResponse.model_validate(projection)
 
 
 @router.post(
@@ -218,50 +387,31 @@ async def process_queue(max_messages: int = 10):
             detail="This endpoint is only available in local development mode",
         )
     
-    results = {"dni": [], "passport": [], "license": []}
     queue = get_queue()
     
-    dni_messages = queue.consume("kyc-ocr-dni", max_messages)
-    
-    if dni_messages:
-        event = {"Records": [{"body": m["body"], "receiptHandle": m["receipt_handle"]} for m in dni_messages]}
+    async def drain(queue_name: str, handler, label: str) -> list[dict[str, Any]]:
+        messages = await run_in_threadpool(queue.consume, queue_name, max_messages)
+        if not messages:
+            return []
+        
+        event = {"Records": [{"body": m["body"], "receiptHandle": m["receipt_handle"]} for m in messages]}
         try:
-            result = dni_handler(event, None)
-            body = json.loads(result.get("body", "{}")) if isinstance(result.get("body"), str) else result
-            results["dni"] = body.get("results", [])
-            for m in dni_messages:
-                queue.delete_message("kyc-ocr-dni", m["receipt_handle"])
-        except Exception as e:
-            logger.error(f"DNI processing failed: {e}")
-            results["dni"] = [{"error": str(e)}]
-    
-    passport_messages = queue.consume("kyc-ocr-passport", max_messages)
-    
-    if passport_messages:
-        event = {"Records": [{"body": m["body"], "receiptHandle": m["receipt_handle"]} for m in passport_messages]}
-        try:
-            result = passport_handler(event, None)
-            body = json.loads(result.get("body", "{}")) if isinstance(result.get("body"), str) else result
-            results["passport"] = body.get("results", [])
-            for m in passport_messages:
-                queue.delete_message("kyc-ocr-passport", m["receipt_handle"])
+            result = await run_in_threadpool(handler, event, None, return_python=True)
+            body = result["body"]
+            await run_in_threadpool(
+                queue.delete_messages_batch, queue_name, [m["receipt_handle"] for m in messages]
+            )
+            return body.get("results", [])
         except Exception as e:
-            logger.error(f"Passport processing failed: {e}")
-            results["passport"] = [{"error": str(e)}]
+            logger.error(f"{label} processing failed: {e}")
+            return [{"error": str(e)}]
     
-    license_messages = queue.consume("kyc-ocr-license", max_messages)
-    
-    if license_messages:
-        event = {"Records": [{"body": m["body"], "receiptHandle": m["receipt_handle"]} for m in license_messages]}
-        try:
-            result = license_handler(event, None)
-            body = json.loads(result.get("body", "{}")) if isinstance(result.get("body"), str) else result
-            results["license"] = body.get("results", [])
-            for m in license_messages:
-                queue.delete_message("kyc-ocr-license", m["receipt_handle"])
-        except Exception as e:
-            logger.error(f"License processing failed: {e}")
-            results["license"] = [{"error": str(e)}]
+    dni_results, passport_results, license_results = await asyncio.gather(
+        drain(config.QUEUE_DNI_NAME, dni_handler, "DNI"),
+        drain(config.QUEUE_PASSPORT_NAME, passport_handler, "Passport"),
+        drain(config.QUEUE_LICENSE_NAME, license_handler, "License"),
+    )
+    results = {"dni": dni_results, "passport": passport_results, "license": license_results}
     
     total_processed = len(results["dni"]) + len(results["passport"]) + len(results["license"])
     
@@ -1,12 +1,35 @@
 from kyc_platform.api_handler.services.id_generator import generate_document_id, generate_verification_id
 from kyc_platform.api_handler.services.enqueue import EnqueueService, enqueue_service
-from kyc_platform.api_handler.services.idempotency import generate_idempotency_key, IdempotencyService
+from kyc_platform.api_handler.services.idempotency import (
+    build_idempotency_key,
+    generate_idempotency_key,
+    new_hasher,
+    new_image_hasher,
+    IdempotencyService,
+    JpegMetadataStripper,
+)
+from kyc_platform.api_handler.services.image_store import (
+    ImageTooLargeError,
+    check_base64_image,
+    hash_and_persist,
+    iter_decoded_chunks,
+    persist_image,
+)
 
 __all__ = [
     "generate_document_id",
     "generate_verification_id",
     "EnqueueService",
     "enqueue_service",
+    "build_idempotency_key",
     "generate_idempotency_key",
+    "new_hasher",
+    "new_image_hasher",
     "IdempotencyService",
+    "JpegMetadataStripper",
+    "ImageTooLargeError",
+    "check_base64_image",
+    "hash_and_persist",
+    "iter_decoded_chunks",
+    "persist_image",
 ]
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Any, Optional
 
-from kyc_platform.contracts.events import EventFactory, DocumentUploadedEvent
+from kyc_platform.contracts.events import EventFactory
 from kyc_platform.queue import get_queue
 from kyc_platform.shared.config import config, DocumentType
 from kyc_platform.shared.logging import get_logger
@@ -22,8 +22,9 @@ class EnqueueService:
         check_authenticity: bool = False,
         check_document_liveness: bool = False,
         frames: Optional[list[str]] = None,
+        idempotency_key: Optional[str] = None,
     ) -> bool:
-        event = EventFactory.create_document_uploaded(
+        event = EventFactory.document_uploaded_payload(
             document_id=document_id,
             verification_id=verification_id,
             client_id=client_id,
@@ -32,9 +33,10 @@ class EnqueueService:
             check_authenticity=check_authenticity,
             check_document_liveness=check_document_liveness,
             frames=frames,
+            idempotency_key=idempotency_key,
         )
         
-        queue_name = config.get_queue_name_for_document_type(document_type)
+        queue_name = config.QUEUE_NAME_BY_DOCUMENT_TYPE[document_type]
         
         logger.info(
             f"Enqueueing document.uploaded.v1 to {queue_name}",
@@ -47,7 +49,37 @@ class EnqueueService:
             },
         )
         
-        return self.queue.publish(queue_name, event.model_dump())
+        return self.queue.publish(queue_name, event)
+    
+    def enqueue_documents_uploaded(self, uploads: list[dict[str, Any]]) -> list[bool]:
+        """
+        Enqueue several document.uploaded.v1 events, publishing each target
+        queue's events as one batch.
+        
+        Each item holds the keyword arguments of enqueue_document_uploaded.
+        Returns one success flag per item, in input order.
+        """
+        results = [False] * len(uploads)
+        batches: dict[str, list[tuple[int, dict[str, Any]]]] = {}
+        
+        for index, upload in enumerate(uploads):
+            event = EventFactory.document_uploaded_payload(**upload)
+            queue_name = config.QUEUE_NAME_BY_DOCUMENT_TYPE[upload["document_type"]]
+            batches.setdefault(queue_name, []).append((index, event))
+        
+        for queue_name, items in batches.items():
+            logger.info(
+                f"Enqueueing {len(items)} document.uploaded.v1 event(s) to {queue_name}",
+                extra={
+                    "document_ids": [uploads[index]["document_id"] for index, _ in items],
+                    "queue": queue_name,
+                },
+            )
+            published = self.queue.publish_batch(queue_name, [event for _, event in items])
+            for (index, _), success in zip(items, published):
+                results[index] = success
+        
+        return results
 
 
 enqueue_service = EnqueueService()
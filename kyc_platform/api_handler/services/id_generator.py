@@ -1,14 +1,19 @@
-import uuid
+import secrets
 import time
 
+# Document IDs are the only handle on GET /documents/{document_id}, so the
+# suffix must stay unpredictable; token_hex(4) is a single os.urandom(4) draw.
+
+
+def _rand8() -> str:
+    return secrets.token_hex(4)
+
 
 def generate_document_id() -> str:
     timestamp = int(time.time() * 1000)
-    unique = uuid.uuid4().hex[:8]
-    return f"doc_{timestamp}_{unique}"
+    return f"doc_{timestamp}_{_rand8()}"
 
 
 def generate_verification_id() -> str:
     timestamp = int(time.time() * 1000)
-    unique = uuid.uuid4().hex[:8]
-    return f"ver_{timestamp}_{unique}"
+    return f"ver_{timestamp}_{_rand8()}"
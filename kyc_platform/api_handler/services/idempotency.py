@@ -1,44 +1,186 @@
-import base64
 import hashlib
-import io
 from typing import Optional
 
-from PIL import Image
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
-from kyc_platform.shared.config import DocumentType
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+from kyc_platform.api_handler.services.image_store import iter_decoded_chunks
+from kyc_platform.shared.config import config, DocumentType
 from kyc_platform.shared.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Enum .value goes through a descriptor; a plain dict lookup is ~4x cheaper.
+_DOCUMENT_TYPE_VALUES = {document_type: document_type.value for document_type in DocumentType}
+
 
-def normalize_image(image_base64: str) -> bytes:
+def _resolve_hasher_factory(version: int):
     """
-    Normalize image by:
-    1. Decoding base64 to binary
-    2. Loading as PIL Image (strips EXIF and other metadata)
-    3. Re-encoding as JPEG with consistent quality
-    
-    This ensures the same visual content produces the same hash,
-    regardless of metadata differences.
+    Map an IDEMPOTENCY_HASH_VERSION to its hasher constructor.
+
+    - 1: SHA-256 (default)
+    - 2: XXH3-128, non-cryptographic but several times faster; content
+      identity does not need collision resistance against adversaries
+    - 3: BLAKE3 (256-bit), cryptographic and SIMD-accelerated, several
+      times faster than SHA-256 on CPUs without SHA extensions
     """
-    try:
-        image_data = base64.b64decode(image_base64)
-        
-        image = Image.open(io.BytesIO(image_data))
-        
-        if image.mode in ("RGBA", "P"):
-            image = image.convert("RGB")
-        
-        output = io.BytesIO()
-        image.save(output, format="JPEG", quality=85)
-        
-        return output.getvalue()
-    except Exception as e:
-        logger.warning(
-            "Failed to normalize image, using raw base64",
-            extra={"error": str(e)},
-        )
-        return image_base64.encode()
+    if version == 1:
+        return hashlib.sha256
+    if version == 2:
+        if xxhash is None:
+            raise RuntimeError(
+                "xxhash is required for IDEMPOTENCY_HASH_VERSION=2. Install it with: pip install xxhash"
+            )
+        return xxhash.xxh3_128
+    if version == 3:
+        if blake3 is None:
+            raise RuntimeError(
+                "blake3 is required for IDEMPOTENCY_HASH_VERSION=3. Install it with: pip install blake3"
+            )
+        return blake3.blake3
+    raise ValueError(f"Unsupported IDEMPOTENCY_HASH_VERSION: {version}")
+
+
+# Resolved at import so a bad version or missing library stops the API at
+# startup instead of failing every upload with a 500.
+_HASHER_FACTORY = _resolve_hasher_factory(config.IDEMPOTENCY_HASH_VERSION)
+
+
+def new_hasher():
+    """Return a fresh hasher for the configured IDEMPOTENCY_HASH_VERSION."""
+    return _HASHER_FACTORY()
+
+
+class JpegMetadataStripper:
+    """
+    Hasher wrapper that drops JPEG APPn (EXIF, XMP, ICC, ...) and COM
+    segments before they reach the wrapped hasher, so re-saving a photo
+    with different metadata still yields the same image hash.
+
+    Works on a byte stream fed through update(); segments may span chunk
+    boundaries. Everything from the first SOS marker on (the entropy-coded
+    image data) is passed through untouched, as is any non-JPEG input.
+    """
+
+    def __init__(self, hasher):
+        self.hasher = hasher
+        self._pending = b""
+        self._skip = 0
+        self._started = False
+        self._passthrough = False
+
+    def update(self, data: bytes) -> None:
+        if self._passthrough:
+            self.hasher.update(data)
+            return
+        if self._skip:
+            if len(data) <= self._skip:
+                self._skip -= len(data)
+                return
+            data = data[self._skip:]
+            self._skip = 0
+
+        buf = self._pending + data if self._pending else bytes(data)
+        pos = 0
+
+        if not self._started:
+            if len(buf) < 2:
+                self._pending = buf
+                return
+            self._started = True
+            if buf[:2] != b"\xff\xd8":
+                self._pass_rest(buf, 0)
+                return
+            self.hasher.update(buf[:2])
+            pos = 2
+
+        while len(buf) - pos >= 4:
+            if buf[pos] != 0xFF:
+                self._pass_rest(buf, pos)
+                return
+            marker = buf[pos + 1]
+            if marker == 0xFF:
+                pos += 1
+                continue
+            if marker == 0xDA:
+                self._pass_rest(buf, pos)
+                return
+            length = int.from_bytes(buf[pos + 2:pos + 4], "big")
+            if length < 2:
+                self._pass_rest(buf, pos)
+                return
+            end = pos + 2 + length
+            if 0xE0 <= marker <= 0xEF or marker == 0xFE:
+                if end > len(buf):
+                    self._skip = end - len(buf)
+                    pos = len(buf)
+                    break
+            else:
+                if end > len(buf):
+                    break
+                self.hasher.update(buf[pos:end])
+            pos = end
+
+        self._pending = buf[pos:]
+
+    def _pass_rest(self, buf: bytes, pos: int) -> None:
+        self.hasher.update(buf[pos:])
+        self._pending = b""
+        self._passthrough = True
+
+    def hexdigest(self) -> str:
+        if self._pending:
+            self.hasher.update(self._pending)
+            self._pending = b""
+        return self.hasher.hexdigest()
+
+
+def new_image_hasher() -> JpegMetadataStripper:
+    """Hasher for image content: new_hasher() behind JpegMetadataStripper."""
+    return JpegMetadataStripper(new_hasher())
+
+
+def hash_image(image_base64: str) -> str:
+    """
+    Hash of the decoded image bytes, computed chunk by chunk so the
+    decoded image is never held in memory at once.
+    """
+    hasher = new_image_hasher()
+    for chunk in iter_decoded_chunks(image_base64):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def build_idempotency_key(
+    client_id: str,
+    document_type: DocumentType,
+    image_hash: str,
+) -> str:
+    """
+    Combine an already computed image hash with the request scope.
+
+    The upload route gets image_hash for free from hash_and_persist, so it
+    only pays for this final short hash.
+
+    Keys are prefixed "v<IDEMPOTENCY_HASH_VERSION>:". Unprefixed keys date
+    from the earlier derivation (hash of a PIL re-encode of the image) and
+    never match a key built here, so uploads are not deduplicated against
+    documents stored before that change.
+    """
+    # One short encode + update measures faster than feeding the three parts
+    # to update() separately; the per-call overhead outweighs the saved copy.
+    content = f"{client_id}:{_DOCUMENT_TYPE_VALUES[document_type]}:{image_hash}"
+    hasher = new_hasher()
+    hasher.update(content.encode())
+    
+    return f"v{config.IDEMPOTENCY_HASH_VERSION}:{hasher.hexdigest()}"
 
 
 def generate_idempotency_key(
@@ -50,18 +192,14 @@ def generate_idempotency_key(
     Generate idempotency key from:
     - client_id
     - document_type
-    - normalized image content (stripped of metadata)
+    - decoded image content
     
     This ensures:
     - Same image with different EXIF = same hash
-    - Same image re-encoded = same hash
+    - Same image with different base64 line wrapping = same hash
     - Different clients with same image = different hash
     """
-    normalized_image = normalize_image(image_base64)
-    image_hash = hashlib.sha256(normalized_image).hexdigest()
-    
-    content = f"{client_id}:{document_type.value}:{image_hash}"
-    return hashlib.sha256(content.encode()).hexdigest()
+    return build_idempotency_key(client_id, document_type, hash_image(image_base64))
 
 
 class IdempotencyService:
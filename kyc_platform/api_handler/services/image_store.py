@@ -0,0 +1,137 @@
+import os
+from typing import Iterable, Iterator, Union
+
+try:
+    from pybase64 import b64decode as decode_base64
+except ImportError:
+    from binascii import a2b_base64 as decode_base64
+
+from kyc_platform.shared.config import config
+
+# Multiple of 4 so every slice decodes to whole base64 quanta. Decoded chunks
+# are written as-is: neither decoder can fill a caller-owned buffer, and
+# staging them in a reusable scratch buffer only adds a copy per chunk.
+B64_CHUNK_SIZE = 64 * 1024
+
+_B64_WHITESPACE = b" \t\r\n\v\f"
+
+IMAGE_PATH_TEMPLATE = os.path.join(config.UPLOAD_DIR, "{}.jpg")
+
+_upload_dir_ready = False
+
+
+class ImageTooLargeError(ValueError):
+    pass
+
+
+def check_base64_image(image_base64: str) -> str:
+    """
+    Cheap shape checks (size, quantum length) that need no decode. Returns
+    the stripped payload; raises ImageTooLargeError or ValueError.
+    """
+    if len(image_base64) > config.MAX_IMAGE_B64_LEN:
+        raise ImageTooLargeError("Image too large")
+
+    payload = image_base64.strip()
+    if "\n" not in payload and len(payload) % 4 != 0:
+        raise ValueError("Invalid base64 image")
+    return payload
+
+
+def iter_decoded_chunks(image_base64: str) -> Iterator[bytes]:
+    """
+    Decode a base64 image lazily, yielding ~48 KiB of binary data at a time
+    so the full decoded image never has to sit in memory.
+    """
+    payload = check_base64_image(image_base64)
+    if "\n" in payload:
+        yield from _iter_decoded_wrapped(payload)
+        return
+
+    try:
+        for offset in range(0, len(payload), B64_CHUNK_SIZE):
+            yield decode_base64(payload[offset:offset + B64_CHUNK_SIZE])
+    except ValueError:
+        raise ValueError("Invalid base64 image")
+
+
+def _iter_decoded_wrapped(payload: str) -> Iterator[bytes]:
+    """
+    Line-wrapped (MIME-style) base64: whitespace is dropped per chunk, with
+    any partial quantum carried into the next one, instead of building a
+    whitespace-free copy of the whole payload first.
+    """
+    carry = b""
+    try:
+        for offset in range(0, len(payload), B64_CHUNK_SIZE):
+            text = payload[offset:offset + B64_CHUNK_SIZE].encode("ascii")
+            piece = carry + text.translate(None, _B64_WHITESPACE)
+            usable = len(piece) - len(piece) % 4
+            if usable:
+                yield decode_base64(piece[:usable])
+            carry = piece[usable:]
+    except ValueError:
+        raise ValueError("Invalid base64 image")
+    if carry:
+        raise ValueError("Invalid base64 image")
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _ensure_upload_dir() -> None:
+    global _upload_dir_ready
+    if not _upload_dir_ready:
+        os.makedirs(config.UPLOAD_DIR, exist_ok=True)
+        _upload_dir_ready = True
+
+
+def persist_image(data: Union[bytes, Iterable[bytes]], document_id: str) -> str:
+    """
+    Write image bytes (or an iterable of byte chunks) for a document and
+    return the image_ref consumed by the OCR workers.
+
+    Chunks go straight to the file descriptor; a partially written file is
+    removed if the source raises mid-stream.
+    """
+    _ensure_upload_dir()
+
+    filepath = IMAGE_PATH_TEMPLATE.format(document_id)
+    chunks = (data,) if isinstance(data, (bytes, bytearray, memoryview)) else data
+
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        for chunk in chunks:
+            _write_all(fd, chunk)
+    except Exception:
+        os.remove(filepath)
+        raise
+    finally:
+        os.close(fd)
+
+    return filepath
+
+
+def hash_and_persist(image_base64: str, document_id: str, hasher) -> tuple[str, str]:
+    """
+    Decode, hash and write an uploaded image in a single pass over the
+    payload. hasher is any hashlib-style object (see idempotency.new_image_hasher).
+    Returns (image_ref, hex digest of the decoded bytes).
+
+    Routes call this through run_in_threadpool. hashlib digest updates on
+    48 KiB chunks, os.write and pybase64's decode release the GIL, so
+    concurrent uploads largely overlap without an extension module. The
+    binascii fallback decode and JpegMetadataStripper's walk over the JPEG
+    header segments hold it; the header walk is short.
+    """
+    def hashed_chunks() -> Iterator[bytes]:
+        for chunk in iter_decoded_chunks(image_base64):
+            hasher.update(chunk)
+            yield chunk
+
+    filepath = persist_image(hashed_chunks(), document_id)
+    return filepath, hasher.hexdigest()
@@ -1,13 +1,14 @@
-from datetime import datetime
+import inspect
 from typing import Any, Optional
 from pydantic import BaseModel, Field
 
+from kyc_platform.shared.clock import utc_now_iso
 from kyc_platform.shared.config import DocumentType
 
 
 class BaseEvent(BaseModel):
     event: str
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: str = Field(default_factory=utc_now_iso)
     version: str = "1"
 
 
@@ -21,6 +22,7 @@ class DocumentUploadedEvent(BaseEvent):
     check_authenticity: bool = False
     check_document_liveness: bool = False
     frames: Optional[list[str]] = None
+    idempotency_key: Optional[str] = None
 
 
 class DocumentExtractedEvent(BaseEvent):
@@ -37,6 +39,9 @@ class DocumentExtractedEvent(BaseEvent):
 
 
 class EventFactory:
+    # Factory arguments come from our own code, already typed, so events are
+    # built with model_construct() and skip per-field validation.
+    
     @staticmethod
     def create_document_uploaded(
         document_id: str,
@@ -47,8 +52,9 @@ class EventFactory:
         check_authenticity: bool = False,
         check_document_liveness: bool = False,
         frames: Optional[list[str]] = None,
+        idempotency_key: Optional[str] = None,
     ) -> DocumentUploadedEvent:
-        return DocumentUploadedEvent(
+        return DocumentUploadedEvent.model_construct(
             document_id=document_id,
             verification_id=verification_id,
             client_id=client_id,
@@ -57,8 +63,44 @@ class EventFactory:
             check_authenticity=check_authenticity,
             check_document_liveness=check_document_liveness,
             frames=frames,
+            idempotency_key=idempotency_key,
         )
     
+    @staticmethod
+    def document_uploaded_payload(
+        document_id: str,
+        verification_id: str,
+        client_id: str,
+        document_type: DocumentType,
+        image_ref: str,
+        check_authenticity: bool = False,
+        check_document_liveness: bool = False,
+        frames: Optional[list[str]] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """
+        Build the document.uploaded.v1 queue payload directly, equivalent to
+        create_document_uploaded(...).model_dump() without running model
+        validation and serialization over already trusted values.
+        
+        Key order and constant fields come from _UPLOADED_PAYLOAD_TEMPLATE,
+        which is checked against DocumentUploadedEvent at import.
+        """
+        payload = dict(_UPLOADED_PAYLOAD_TEMPLATE)
+        payload.update(
+            timestamp=utc_now_iso(),
+            document_id=document_id,
+            verification_id=verification_id,
+            client_id=client_id,
+            document_type=document_type,
+            image_ref=image_ref,
+            check_authenticity=check_authenticity,
+            check_document_liveness=check_document_liveness,
+            frames=frames,
+            idempotency_key=idempotency_key,
+        )
+        return payload
+    
     @staticmethod
     def create_document_extracted(
         document_id: str,
@@ -71,7 +113,7 @@ class EventFactory:
         authenticity_result: Optional[dict[str, Any]] = None,
         liveness_result: Optional[dict[str, Any]] = None,
     ) -> DocumentExtractedEvent:
-        return DocumentExtractedEvent(
+        return DocumentExtractedEvent.model_construct(
             document_id=document_id,
             verification_id=verification_id,
             document_type=document_type,
@@ -82,3 +124,24 @@ class EventFactory:
             authenticity_result=authenticity_result,
             liveness_result=liveness_result,
         )
+
+
+def _uploaded_payload_template() -> dict[str, Any]:
+    """
+    DocumentUploadedEvent's fields in model order: parameters of
+    document_uploaded_payload (plus timestamp) as placeholders, every other
+    field at its model default. Raises if the two have drifted apart.
+    """
+    filled = {"timestamp"} | set(inspect.signature(EventFactory.document_uploaded_payload).parameters)
+    fields = DocumentUploadedEvent.model_fields
+    unknown = filled - set(fields)
+    missing = [name for name, info in fields.items() if name not in filled and info.is_required()]
+    if unknown or missing:
+        raise RuntimeError(
+            "document_uploaded_payload is out of sync with DocumentUploadedEvent: "
+            f"unknown {sorted(unknown)}, missing {missing}"
+        )
+    return {name: None if name in filled else info.get_default(call_default_factory=True) for name, info in fields.items()}
+
+
+_UPLOADED_PAYLOAD_TEMPLATE = _uploaded_payload_template()
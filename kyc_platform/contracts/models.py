@@ -1,8 +1,8 @@
-from datetime import datetime
 from enum import Enum
 from typing import Any, Optional
 from pydantic import BaseModel, Field
 
+from kyc_platform.shared.clock import utc_now_iso
 from kyc_platform.shared.config import DocumentType
 
 
@@ -49,22 +49,25 @@ class DocumentRecord(BaseModel):
     document_type: DocumentType
     status: DocumentStatus = DocumentStatus.PENDING
     image_ref: str
-    created_at: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
-    updated_at: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    created_at: str = Field(default_factory=utc_now_iso)
+    updated_at: str = Field(default_factory=utc_now_iso)
     extracted_data: Optional[dict[str, Any]] = None
     confidence: Optional[float] = None
     processing_time_ms: Optional[int] = None
     errors: Optional[list[str]] = None
     idempotency_key: Optional[str] = None
     
-    def mark_queued(self) -> "DocumentRecord":
+    # Each mark_* accepts an optional precomputed timestamp so callers that
+    # transition many records at once can format the time a single time.
+    
+    def mark_queued(self, now: Optional[str] = None) -> "DocumentRecord":
         self.status = DocumentStatus.QUEUED
-        self.updated_at = datetime.utcnow().isoformat()
+        self.updated_at = now or utc_now_iso()
         return self
     
-    def mark_processing(self) -> "DocumentRecord":
+    def mark_processing(self, now: Optional[str] = None) -> "DocumentRecord":
         self.status = DocumentStatus.PROCESSING
-        self.updated_at = datetime.utcnow().isoformat()
+        self.updated_at = now or utc_now_iso()
         return self
     
     def mark_extracted(
@@ -72,16 +75,17 @@ class DocumentRecord(BaseModel):
         extracted_data: dict[str, Any],
         confidence: float,
         processing_time_ms: int,
+        now: Optional[str] = None,
     ) -> "DocumentRecord":
         self.status = DocumentStatus.EXTRACTED
         self.extracted_data = extracted_data
         self.confidence = confidence
         self.processing_time_ms = processing_time_ms
-        self.updated_at = datetime.utcnow().isoformat()
+        self.updated_at = now or utc_now_iso()
         return self
     
-    def mark_failed(self, errors: list[str]) -> "DocumentRecord":
+    def mark_failed(self, errors: list[str], now: Optional[str] = None) -> "DocumentRecord":
         self.status = DocumentStatus.FAILED
         self.errors = errors
-        self.updated_at = datetime.utcnow().isoformat()
+        self.updated_at = now or utc_now_iso()
         return self
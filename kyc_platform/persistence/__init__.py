@@ -3,8 +3,14 @@ from kyc_platform.persistence.sqlite_repository import SQLiteDocumentRepository
 from kyc_platform.shared.config import config
 
 
+_repository: DocumentRepository | None = None
+
+
 def get_repository() -> DocumentRepository:
-    return SQLiteDocumentRepository()
+    global _repository
+    if _repository is None:
+        _repository = SQLiteDocumentRepository()
+    return _repository
 
 
 __all__ = ["DocumentRepository", "SQLiteDocumentRepository", "get_repository"]
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Optional
 
 from kyc_platform.contracts.models import DocumentRecord
 
@@ -9,10 +9,39 @@ class DocumentRepository(ABC):
     def save(self, record: DocumentRecord) -> bool:
         pass
     
+    def save_if_new(self, record: DocumentRecord) -> Optional[DocumentRecord]:
+        """
+        Insert record unless another document already holds its
+        idempotency_key. Returns None when inserted, otherwise the existing
+        document. Backends with conditional inserts should do this atomically.
+        """
+        existing = self.get_by_idempotency_key(record.idempotency_key)
+        if existing:
+            return existing
+        if not self.save(record):
+            raise RuntimeError(f"Failed to save document {record.document_id}")
+        return None
+    
     @abstractmethod
     def get_by_id(self, document_id: str) -> Optional[DocumentRecord]:
         pass
     
+    def get_status_projection(self, document_id: str) -> Optional[dict[str, Any]]:
+        record = self.get_by_id(document_id)
+        if not record:
+            return None
+        return {
+            "document_id": record.document_id,
+            "verification_id": record.verification_id,
+            "document_type": record.document_type.value,
+            "status": record.status.value,
+            "extracted_data": record.extracted_data,
+            "confidence": record.confidence,
+            "processing_time_ms": record.processing_time_ms,
+            "errors": record.errors,
+            "updated_at": record.updated_at,
+        }
+    
     @abstractmethod
     def get_by_verification_id(self, verification_id: str) -> list[DocumentRecord]:
         pass
@@ -25,6 +54,9 @@ class DocumentRepository(ABC):
     def update(self, record: DocumentRecord) -> bool:
         pass
     
+    def update_many(self, records: list[DocumentRecord]) -> bool:
+        return all([self.update(record) for record in records])
+    
     @abstractmethod
     def delete(self, document_id: str) -> bool:
         pass
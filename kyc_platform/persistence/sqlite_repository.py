@@ -1,29 +1,124 @@
-import json
+import atexit
 import os
 import sqlite3
-from typing import Optional
+import threading
+from typing import Any, Optional
+
+from pydantic import TypeAdapter
 
 from kyc_platform.contracts.models import DocumentRecord, DocumentStatus
 from kyc_platform.persistence.base import DocumentRepository
 from kyc_platform.shared.config import config, DocumentType
+from kyc_platform.shared.jsonlib import dumps as _dumps, loads as _loads
 from kyc_platform.shared.logging import get_logger
 
 logger = get_logger(__name__)
 
+UPDATE_SQL = """
+    UPDATE documents SET
+        verification_id = ?,
+        client_id = ?,
+        document_type = ?,
+        status = ?,
+        image_ref = ?,
+        updated_at = ?,
+        extracted_data = ?,
+        confidence = ?,
+        processing_time_ms = ?,
+        errors = ?
+    WHERE document_id = ?
+"""
+
+INSERT_SQL = """
+    INSERT INTO documents
+    (document_id, verification_id, client_id, document_type, status,
+     image_ref, created_at, updated_at, extracted_data, confidence,
+     processing_time_ms, errors, idempotency_key)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# A full row rendered as a JSON object by SQLite. Multi-row reads join these
+# into one JSON array that pydantic-core parses and validates into
+# DocumentRecords in a single call, instead of decoding row by row in Python.
+RECORD_JSON_SQL = """
+    json_object(
+        'document_id', document_id,
+        'verification_id', verification_id,
+        'client_id', client_id,
+        'document_type', document_type,
+        'status', status,
+        'image_ref', image_ref,
+        'created_at', created_at,
+        'updated_at', updated_at,
+        'extracted_data', json(extracted_data),
+        'confidence', confidence,
+        'processing_time_ms', processing_time_ms,
+        'errors', json(errors),
+        'idempotency_key', idempotency_key
+    )
+"""
+
+_record_list_adapter = TypeAdapter(list[DocumentRecord])
+
+
+# Both enums subclass str, so they bind directly as TEXT parameters; reading
+# back goes through plain dict lookups instead of Enum.__call__.
+DOCUMENT_TYPE_BY_VALUE = {member.value: member for member in DocumentType}
+DOCUMENT_STATUS_BY_VALUE = {member.value: member for member in DocumentStatus}
+
+
+# Per-connection tuning: WAL only needs a sync at checkpoints under
+# synchronous=NORMAL, reads go through mmap, and each connection keeps an
+# 8 MiB page cache (there is one connection per API threadpool thread).
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8192",
+)
+
 
 class SQLiteDocumentRepository(DocumentRepository):
     def __init__(self, db_path: str | None = None):
         self.db_path = db_path or config.SQLITE_DB_PATH
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        atexit.register(self.close)
         self._init_db()
     
     def _get_connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """
+        Connection owned by the calling thread, opened on first use and kept
+        for the lifetime of the repository.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only the owning thread uses it; cross-thread access is for close().
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
         return conn
     
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+    
     def _init_db(self) -> None:
         with self._get_connection() as conn:
+            # journal_mode is stored in the database file, so set it once here.
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS documents (
                     document_id TEXT PRIMARY KEY,
@@ -53,49 +148,44 @@ class SQLiteDocumentRepository(DocumentRepository):
             conn.commit()
     
     def _row_to_record(self, row: sqlite3.Row) -> DocumentRecord:
-        return DocumentRecord(
+        # Rows were validated on the way in; only the enums and JSON columns need decoding.
+        return DocumentRecord.model_construct(
             document_id=row["document_id"],
             verification_id=row["verification_id"],
             client_id=row["client_id"],
-            document_type=DocumentType(row["document_type"]),
-            status=DocumentStatus(row["status"]),
+            document_type=DOCUMENT_TYPE_BY_VALUE[row["document_type"]],
+            status=DOCUMENT_STATUS_BY_VALUE[row["status"]],
             image_ref=row["image_ref"],
             created_at=row["created_at"],
             updated_at=row["updated_at"],
-            extracted_data=json.loads(row["extracted_data"]) if row["extracted_data"] else None,
+            extracted_data=_loads(row["extracted_data"]) if row["extracted_data"] else None,
             confidence=row["confidence"],
             processing_time_ms=row["processing_time_ms"],
-            errors=json.loads(row["errors"]) if row["errors"] else None,
+            errors=_loads(row["errors"]) if row["errors"] else None,
             idempotency_key=row["idempotency_key"] if "idempotency_key" in row.keys() else None,
         )
     
+    def _insert_params(self, record: DocumentRecord) -> tuple:
+        return (
+            record.document_id,
+            record.verification_id,
+            record.client_id,
+            record.document_type,
+            record.status,
+            record.image_ref,
+            record.created_at,
+            record.updated_at,
+            _dumps(record.extracted_data) if record.extracted_data else None,
+            record.confidence,
+            record.processing_time_ms,
+            _dumps(record.errors) if record.errors else None,
+            record.idempotency_key,
+        )
+    
     def save(self, record: DocumentRecord) -> bool:
         try:
             with self._get_connection() as conn:
-                conn.execute(
-                    """
-                    INSERT INTO documents 
-                    (document_id, verification_id, client_id, document_type, status, 
-                     image_ref, created_at, updated_at, extracted_data, confidence, 
-                     processing_time_ms, errors, idempotency_key)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        record.document_id,
-                        record.verification_id,
-                        record.client_id,
-                        record.document_type.value,
-                        record.status.value,
-                        record.image_ref,
-                        record.created_at,
-                        record.updated_at,
-                        json.dumps(record.extracted_data) if record.extracted_data else None,
-                        record.confidence,
-                        record.processing_time_ms,
-                        json.dumps(record.errors) if record.errors else None,
-                        record.idempotency_key,
-                    ),
-                )
+                conn.execute(INSERT_SQL, self._insert_params(record))
                 conn.commit()
             logger.info(f"Saved document record", extra={"document_id": record.document_id})
             return True
@@ -103,6 +193,22 @@ class SQLiteDocumentRepository(DocumentRepository):
             logger.error(f"Failed to save document: {e}")
             return False
     
+    def save_if_new(self, record: DocumentRecord) -> Optional[DocumentRecord]:
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                INSERT_SQL + " ON CONFLICT(idempotency_key) DO NOTHING",
+                self._insert_params(record),
+            )
+            if cursor.rowcount == 0:
+                row = conn.execute(
+                    "SELECT * FROM documents WHERE idempotency_key = ?",
+                    (record.idempotency_key,),
+                ).fetchone()
+                return self._row_to_record(row)
+            conn.commit()
+        logger.info(f"Saved document record", extra={"document_id": record.document_id})
+        return None
+    
     def get_by_idempotency_key(self, idempotency_key: str) -> Optional[DocumentRecord]:
         with self._get_connection() as conn:
             row = conn.execute(
@@ -119,46 +225,52 @@ class SQLiteDocumentRepository(DocumentRepository):
             ).fetchone()
             return self._row_to_record(row) if row else None
     
-    def get_by_verification_id(self, verification_id: str) -> list[DocumentRecord]:
+    def get_status_projection(self, document_id: str) -> Optional[dict[str, Any]]:
         with self._get_connection() as conn:
-            rows = conn.execute(
-                "SELECT * FROM documents WHERE verification_id = ?",
-                (verification_id,),
-            ).fetchall()
-            return [self._row_to_record(row) for row in rows]
+            row = conn.execute(
+                """
+                SELECT document_id, verification_id, document_type, status,
+                       extracted_data, confidence, processing_time_ms, errors, updated_at
+                FROM documents WHERE document_id = ?
+                """,
+                (document_id,),
+            ).fetchone()
+        if not row:
+            return None
+        projection = dict(row)
+        projection["extracted_data"] = _loads(row["extracted_data"]) if row["extracted_data"] else None
+        projection["errors"] = _loads(row["errors"]) if row["errors"] else None
+        return projection
+    
+    def _select_records(self, clause: str, params: tuple) -> list[DocumentRecord]:
+        with self._get_connection() as conn:
+            rows = conn.execute(f"SELECT {RECORD_JSON_SQL} FROM documents {clause}", params).fetchall()
+        if not rows:
+            return []
+        return _record_list_adapter.validate_json("[" + ",".join(row[0] for row in rows) + "]")
+    
+    def get_by_verification_id(self, verification_id: str) -> list[DocumentRecord]:
+        return self._select_records("WHERE verification_id = ?", (verification_id,))
+    
+    def _update_params(self, record: DocumentRecord) -> tuple:
+        return (
+            record.verification_id,
+            record.client_id,
+            record.document_type,
+            record.status,
+            record.image_ref,
+            record.updated_at,
+            _dumps(record.extracted_data) if record.extracted_data else None,
+            record.confidence,
+            record.processing_time_ms,
+            _dumps(record.errors) if record.errors else None,
+            record.document_id,
+        )
     
     def update(self, record: DocumentRecord) -> bool:
         try:
             with self._get_connection() as conn:
-                conn.execute(
-                    """
-                    UPDATE documents SET
-                        verification_id = ?,
-                        client_id = ?,
-                        document_type = ?,
-                        status = ?,
-                        image_ref = ?,
-                        updated_at = ?,
-                        extracted_data = ?,
-                        confidence = ?,
-                        processing_time_ms = ?,
-                        errors = ?
-                    WHERE document_id = ?
-                    """,
-                    (
-                        record.verification_id,
-                        record.client_id,
-                        record.document_type.value,
-                        record.status.value,
-                        record.image_ref,
-                        record.updated_at,
-                        json.dumps(record.extracted_data) if record.extracted_data else None,
-                        record.confidence,
-                        record.processing_time_ms,
-                        json.dumps(record.errors) if record.errors else None,
-                        record.document_id,
-                    ),
-                )
+                conn.execute(UPDATE_SQL, self._update_params(record))
                 conn.commit()
             logger.info(f"Updated document record", extra={"document_id": record.document_id})
             return True
@@ -166,6 +278,18 @@ class SQLiteDocumentRepository(DocumentRepository):
             logger.error(f"Failed to update document: {e}")
             return False
     
+    def update_many(self, records: list[DocumentRecord]) -> bool:
+        if not records:
+            return True
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(UPDATE_SQL, [self._update_params(record) for record in records])
+            logger.info(f"Updated {len(records)} document record(s)")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update documents: {e}")
+            return False
+    
     def delete(self, document_id: str) -> bool:
         try:
             with self._get_connection() as conn:
@@ -177,9 +301,4 @@ class SQLiteDocumentRepository(DocumentRepository):
             return False
     
     def list_all(self, limit: int = 100, offset: int = 0) -> list[DocumentRecord]:
-        with self._get_connection() as conn:
-            rows = conn.execute(
-                "SELECT * FROM documents ORDER BY created_at DESC LIMIT ? OFFSET ?",
-                (limit, offset),
-            ).fetchall()
-            return [self._row_to_record(row) for row in rows]
+        return self._select_records("ORDER BY created_at DESC LIMIT ? OFFSET ?", (limit, offset))
@@ -5,10 +5,14 @@ from kyc_platform.queue.dlq import DLQHandler, DLQMessage, WorkerErrorHandler
 from kyc_platform.shared.config import config, Environment
 
 
+_queue: EventQueue | None = None
+
+
 def get_queue() -> EventQueue:
-    if config.is_local():
-        return MockQueue()
-    return SQSQueue()
+    global _queue
+    if _queue is None:
+        _queue = MockQueue() if config.is_local() else SQSQueue()
+    return _queue
 
 
 __all__ = [
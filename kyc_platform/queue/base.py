@@ -7,6 +7,9 @@ class EventQueue(ABC):
     def publish(self, queue_name: str, event: dict[str, Any]) -> bool:
         pass
     
+    def publish_batch(self, queue_name: str, events: list[dict[str, Any]]) -> list[bool]:
+        return [self.publish(queue_name, event) for event in events]
+    
     @abstractmethod
     def consume(self, queue_name: str, max_messages: int = 10) -> list[dict[str, Any]]:
         pass
@@ -15,6 +18,9 @@ class EventQueue(ABC):
     def delete_message(self, queue_name: str, receipt_handle: str) -> bool:
         pass
     
+    def delete_messages_batch(self, queue_name: str, receipt_handles: list[str]) -> list[bool]:
+        return [self.delete_message(queue_name, handle) for handle in receipt_handles]
+    
     @abstractmethod
     def get_queue_size(self, queue_name: str) -> int:
         pass
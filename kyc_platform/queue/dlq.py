@@ -1,7 +1,7 @@
 from typing import Any, Optional
-from datetime import datetime
 
 from kyc_platform.queue.base import EventQueue
+from kyc_platform.shared.clock import utc_now_iso
 from kyc_platform.shared.logging import get_logger
 
 logger = get_logger(__name__)
@@ -10,6 +10,19 @@ logger = get_logger(__name__)
 class DLQMessage:
     """Dead Letter Queue message with full error context."""
     
+    __slots__ = (
+        "original_message",
+        "error_code",
+        "error_message",
+        "stage",
+        "worker_name",
+        "document_id",
+        "verification_id",
+        "attempt_count",
+        "max_receive_count",
+        "failed_at",
+    )
+    
     def __init__(
         self,
         original_message: dict[str, Any],
@@ -31,7 +44,7 @@ class DLQMessage:
         self.verification_id = verification_id
         self.attempt_count = attempt_count
         self.max_receive_count = max_receive_count
-        self.failed_at = datetime.utcnow().isoformat()
+        self.failed_at = utc_now_iso()
     
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -1,95 +1,269 @@
-import json
 import os
+import threading
+import time
 import uuid
-from typing import Any
-from datetime import datetime
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 from kyc_platform.queue.base import EventQueue
 from kyc_platform.shared.config import config
+from kyc_platform.shared.jsonlib import dumps_bytes as _dumps, loads as _loads
 from kyc_platform.shared.logging import get_logger
 
 logger = get_logger(__name__)
 
+# A log is rewritten once it holds this many records and fewer than half of
+# them describe messages still in the queue. Compaction needs fcntl.flock to
+# exclude appends from other processes, so it is skipped where that is missing.
+COMPACT_MIN_RECORDS = 1000
+
+
+def _log_header() -> bytes:
+    return _dumps({"op": "log", "id": uuid.uuid4().hex}) + b"\n"
+
+
+class _QueueState:
+    """In-memory replay of one queue log, up to byte offset `offset`."""
+    
+    def __init__(self, header: bytes = b""):
+        # Identifies the log file; a compacted or cleared log gets a new one.
+        self.header = header
+        self.offset = len(header)
+        self.records = 0
+        self.messages: dict[str, dict[str, Any]] = {}
+    
+    def apply(self, record: dict[str, Any]) -> None:
+        self.records += 1
+        op = record.get("op")
+        if op == "put":
+            message = record["message"]
+            self.messages[message["receipt_handle"]] = message
+        elif op == "recv":
+            for handle in record["receipt_handles"]:
+                message = self.messages.get(handle)
+                if message is not None:
+                    message["visible"] = False
+                    message["receive_count"] = message.get("receive_count", 0) + 1
+        elif op == "show":
+            for handle in record["receipt_handles"]:
+                message = self.messages.get(handle)
+                if message is not None:
+                    message["visible"] = True
+        elif op == "del":
+            for handle in record["receipt_handles"]:
+                self.messages.pop(handle, None)
+
 
 class MockQueue(EventQueue):
+    """
+    File-backed queue for local runs, one append-only JSONL log per queue.
+    
+    Every operation appends a single record (put / recv / show / del) with
+    one O_APPEND write, so publishing costs O(message) instead of rewriting
+    the whole queue. Readers replay the log incrementally from the last
+    offset they saw, which keeps separate processes (API, worker simulator)
+    in sync through the file alone. Logs dominated by consumed or deleted
+    messages are compacted in place.
+    
+    Appends and compaction hold an exclusive flock on a sidecar .lock file
+    (the log itself is replaced on compaction, so it cannot carry the lock);
+    _lock additionally serialises the cached state between threads.
+    """
+    
     def __init__(self, base_dir: str | None = None):
         self.base_dir = base_dir or config.MOCK_QUEUE_DIR
         os.makedirs(self.base_dir, exist_ok=True)
+        self._states: dict[str, _QueueState] = {}
+        self._paths: dict[str, str] = {}
+        self._lock = threading.Lock()
     
     def _get_queue_path(self, queue_name: str) -> str:
-        return os.path.join(self.base_dir, f"{queue_name}.json")
+        path = self._paths.get(queue_name)
+        if path is None:
+            path = self._paths[queue_name] = os.path.join(self.base_dir, f"{queue_name}.jsonl")
+        return path
     
-    def _load_queue(self, queue_name: str) -> list[dict[str, Any]]:
+    def _create_log(self, path: str) -> None:
+        """Create an empty log holding only its header, unless one already exists."""
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_log_header())
+        try:
+            # link() fails if another writer created the log first.
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+    
+    @contextmanager
+    def _file_lock(self, queue_name: str) -> Iterator[None]:
+        """Exclusive lock shared by every process using the queue's log."""
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(f"{self._get_queue_path(queue_name)}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # Closing the descriptor releases the lock.
+            os.close(fd)
+    
+    def _append(self, queue_name: str, records: list[dict[str, Any]]) -> None:
+        data = b"".join(_dumps(record) + b"\n" for record in records)
         path = self._get_queue_path(queue_name)
-        if not os.path.exists(path):
-            return []
+        with self._file_lock(queue_name):
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+            except FileNotFoundError:
+                self._create_log(path)
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+    
+    def _refresh(self, queue_name: str) -> _QueueState:
+        """Bring the cached state up to date with the log. Caller holds _lock."""
+        path = self._get_queue_path(queue_name)
+        state = self._states.get(queue_name)
         try:
-            with open(path, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return []
+            f = open(path, "rb")
+        except FileNotFoundError:
+            state = self._states[queue_name] = _QueueState()
+            return state
+        
+        with f:
+            header = f.readline()
+            if state is None or state.header != header:
+                # New, compacted or cleared log: replay from the start.
+                state = self._states[queue_name] = _QueueState(header)
+            f.seek(state.offset)
+            data = f.read()
+        
+        if data:
+            # A trailing line without a newline is still being written.
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                if not line:
+                    continue
+                try:
+                    state.apply(_loads(line))
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Skipping corrupt record in queue {queue_name}")
+            state.offset += end
+        return state
     
-    def _save_queue(self, queue_name: str, messages: list[dict[str, Any]]) -> None:
+    def _rewrite(self, queue_name: str, messages: list[dict[str, Any]]) -> None:
+        """
+        Atomically replace the log with one put record per message. Caller
+        holds _lock and _file_lock, so no append can land in between.
+        """
         path = self._get_queue_path(queue_name)
-        with open(path, "w") as f:
-            json.dump(messages, f, indent=2)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_log_header())
+            f.write(b"".join(_dumps({"op": "put", "message": m}) + b"\n" for m in messages))
+        os.replace(tmp_path, path)
+        self._states.pop(queue_name, None)
+    
+    def _maybe_compact(self, queue_name: str) -> None:
+        if fcntl is None:
+            return
+        with self._file_lock(queue_name):
+            state = self._refresh(queue_name)
+            if state.records >= COMPACT_MIN_RECORDS and len(state.messages) * 2 < state.records:
+                self._rewrite(queue_name, list(state.messages.values()))
+    
+    def _new_message(self, event: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "message_id": str(uuid.uuid4()),
+            "receipt_handle": str(uuid.uuid4()),
+            "body": event,
+            # Epoch milliseconds, as SQS reports SentTimestamp.
+            "sent_timestamp": time.time_ns() // 1_000_000,
+            "visible": True,
+        }
     
     def publish(self, queue_name: str, event: dict[str, Any]) -> bool:
         try:
-            messages = self._load_queue(queue_name)
-            message = {
-                "message_id": str(uuid.uuid4()),
-                "receipt_handle": str(uuid.uuid4()),
-                "body": event,
-                "sent_timestamp": datetime.utcnow().isoformat(),
-                "visible": True,
-            }
-            messages.append(message)
-            self._save_queue(queue_name, messages)
+            message = self._new_message(event)
+            self._append(queue_name, [{"op": "put", "message": message}])
             logger.info(f"Published message to queue {queue_name}", extra={"message_id": message["message_id"]})
             return True
         except Exception as e:
             logger.error(f"Failed to publish to queue {queue_name}: {e}")
             return False
     
+    def publish_batch(self, queue_name: str, events: list[dict[str, Any]]) -> list[bool]:
+        if not events:
+            return []
+        try:
+            self._append(queue_name, [{"op": "put", "message": self._new_message(event)} for event in events])
+            logger.info(f"Published {len(events)} message(s) to queue {queue_name}")
+            return [True] * len(events)
+        except Exception as e:
+            logger.error(f"Failed to publish batch to queue {queue_name}: {e}")
+            return [False] * len(events)
+    
     def consume(self, queue_name: str, max_messages: int = 10) -> list[dict[str, Any]]:
-        messages = self._load_queue(queue_name)
-        visible_messages = [m for m in messages if m.get("visible", True)]
-        result = visible_messages[:max_messages]
-        
-        for msg in result:
-            msg["visible"] = False
-            if "receive_count" not in msg:
-                msg["receive_count"] = 1
-            else:
-                msg["receive_count"] += 1
-        self._save_queue(queue_name, messages)
-        
-        return result
+        with self._lock:
+            state = self._refresh(queue_name)
+            result = []
+            for message in state.messages.values():
+                if len(result) >= max_messages:
+                    break
+                if message.get("visible", True):
+                    result.append(message)
+            if not result:
+                return []
+            
+            handles = [m["receipt_handle"] for m in result]
+            self._append(queue_name, [{"op": "recv", "receipt_handles": handles}])
+            state = self._refresh(queue_name)
+            return [dict(state.messages[handle]) for handle in handles if handle in state.messages]
+    
+    def _delete(self, queue_name: str, receipt_handles: list[str]) -> None:
+        with self._lock:
+            self._append(queue_name, [{"op": "del", "receipt_handles": receipt_handles}])
+            self._maybe_compact(queue_name)
     
     def delete_message(self, queue_name: str, receipt_handle: str) -> bool:
         try:
-            messages = self._load_queue(queue_name)
-            messages = [m for m in messages if m.get("receipt_handle") != receipt_handle]
-            self._save_queue(queue_name, messages)
+            self._delete(queue_name, [receipt_handle])
             logger.info(f"Deleted message from queue {queue_name}", extra={"receipt_handle": receipt_handle})
             return True
         except Exception as e:
             logger.error(f"Failed to delete message: {e}")
             return False
     
+    def delete_messages_batch(self, queue_name: str, receipt_handles: list[str]) -> list[bool]:
+        if not receipt_handles:
+            return []
+        try:
+            self._delete(queue_name, list(receipt_handles))
+            logger.info(f"Deleted {len(receipt_handles)} message(s) from queue {queue_name}")
+            return [True] * len(receipt_handles)
+        except Exception as e:
+            logger.error(f"Failed to delete message batch: {e}")
+            return [False] * len(receipt_handles)
+    
     def get_queue_size(self, queue_name: str) -> int:
-        messages = self._load_queue(queue_name)
-        return len([m for m in messages if m.get("visible", True)])
+        with self._lock:
+            state = self._refresh(queue_name)
+            return sum(1 for m in state.messages.values() if m.get("visible", True))
     
     def make_visible(self, queue_name: str, receipt_handle: str) -> bool:
         try:
-            messages = self._load_queue(queue_name)
-            for m in messages:
-                if m.get("receipt_handle") == receipt_handle:
-                    m["visible"] = True
-                    break
-            self._save_queue(queue_name, messages)
+            self._append(queue_name, [{"op": "show", "receipt_handles": [receipt_handle]}])
             logger.info(f"Made message visible in queue {queue_name}", extra={"receipt_handle": receipt_handle})
             return True
         except Exception as e:
@@ -97,7 +271,10 @@ class MockQueue(EventQueue):
             return False
     
     def peek_all(self, queue_name: str) -> list[dict[str, Any]]:
-        return self._load_queue(queue_name)
+        with self._lock:
+            state = self._refresh(queue_name)
+            return [dict(m) for m in state.messages.values()]
     
     def clear_queue(self, queue_name: str) -> None:
-        self._save_queue(queue_name, [])
+        with self._lock, self._file_lock(queue_name):
+            self._rewrite(queue_name, [])
@@ -1,37 +1,78 @@
-import json
+import functools
 from typing import Any
 
 from kyc_platform.queue.base import EventQueue
+from kyc_platform.shared import jsonlib
+from kyc_platform.shared.config import config
 from kyc_platform.shared.logging import get_logger
 
 logger = get_logger(__name__)
 
+SQS_MAX_BATCH_SIZE = 10
+# SendMessageBatch also caps the summed size of all bodies in one call.
+SQS_MAX_BATCH_BYTES = 256 * 1024
+
+NONEXISTENT_QUEUE_ERROR_CODES = frozenset({"AWS.SimpleQueueService.NonExistentQueue", "QueueDoesNotExist"})
+
+
+@functools.cache
+def _sqs_client(region: str):
+    """
+    One SQS client per region for the whole process. Creating a client
+    resolves credentials and loads botocore's service model, which is the
+    bulk of a cold start; clients are thread-safe, so every SQSQueue shares it.
+    """
+    try:
+        import boto3
+        from botocore.config import Config as BotocoreConfig
+    except ImportError:
+        raise RuntimeError("boto3 is required for SQS. Install it with: pip install boto3")
+    return boto3.session.Session().client(
+        "sqs",
+        region_name=region,
+        config=BotocoreConfig(
+            max_pool_connections=50,
+            retries={"max_attempts": 3, "mode": "adaptive"},
+        ),
+    )
+
 
 class SQSQueue(EventQueue):
-    def __init__(self, region: str = "us-east-1"):
+    def __init__(self, region: str = "us-east-1", wait_time_seconds: int | None = None):
         self.region = region
+        # Long polling: an empty receive waits up to this long (SQS max 20 s)
+        # for messages instead of returning at once.
+        self.wait_time_seconds = config.SQS_WAIT_TIME_SECONDS if wait_time_seconds is None else wait_time_seconds
         self._client = None
+        self._queue_urls: dict[str, str] = {}
     
     @property
     def client(self):
         if self._client is None:
-            try:
-                import boto3
-                self._client = boto3.client("sqs", region_name=self.region)
-            except ImportError:
-                raise RuntimeError("boto3 is required for SQS. Install it with: pip install boto3")
+            self._client = _sqs_client(self.region)
         return self._client
     
     def _get_queue_url(self, queue_name: str) -> str:
-        response = self.client.get_queue_url(QueueName=queue_name)
-        return response["QueueUrl"]
+        # Queue URLs are stable for the life of a queue, so GetQueueUrl runs
+        # once per queue instead of before every operation.
+        queue_url = self._queue_urls.get(queue_name)
+        if queue_url is None:
+            queue_url = self.client.get_queue_url(QueueName=queue_name)["QueueUrl"]
+            self._queue_urls[queue_name] = queue_url
+        return queue_url
+    
+    def _forget_queue_url(self, queue_name: str, error: Exception) -> None:
+        """Drop the cached URL when SQS reports the queue gone (e.g. deleted and recreated)."""
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        if code in NONEXISTENT_QUEUE_ERROR_CODES:
+            self._queue_urls.pop(queue_name, None)
     
     def publish(self, queue_name: str, event: dict[str, Any]) -> bool:
         try:
             queue_url = self._get_queue_url(queue_name)
             response = self.client.send_message(
                 QueueUrl=queue_url,
-                MessageBody=json.dumps(event),
+                MessageBody=jsonlib.dumps(event),
             )
             logger.info(
                 f"Published message to SQS queue {queue_name}",
@@ -39,28 +80,88 @@ class SQSQueue(EventQueue):
             )
             return True
         except Exception as e:
+            self._forget_queue_url(queue_name, e)
             logger.error(f"Failed to publish to SQS queue {queue_name}: {e}")
             return False
     
+    def publish_batch(self, queue_name: str, events: list[dict[str, Any]]) -> list[bool]:
+        if not events:
+            return []
+        try:
+            queue_url = self._get_queue_url(queue_name)
+        except Exception as e:
+            self._forget_queue_url(queue_name, e)
+            logger.error(f"Failed to publish batch to SQS queue {queue_name}: {e}")
+            return [False] * len(events)
+        
+        results = []
+        for batch in self._size_bounded_batches([jsonlib.dumps(event) for event in events]):
+            try:
+                response = self.client.send_message_batch(
+                    QueueUrl=queue_url,
+                    Entries=[
+                        {"Id": str(i), "MessageBody": body}
+                        for i, body in enumerate(batch)
+                    ],
+                )
+                failed_ids = {entry["Id"] for entry in response.get("Failed", [])}
+                results.extend(str(i) not in failed_ids for i in range(len(batch)))
+                logger.info(
+                    f"Published message batch to SQS queue {queue_name}",
+                    extra={"sent": len(batch) - len(failed_ids), "failed": len(failed_ids)},
+                )
+            except Exception as e:
+                self._forget_queue_url(queue_name, e)
+                logger.error(f"Failed to publish batch to SQS queue {queue_name}: {e}")
+                results.extend([False] * len(batch))
+        return results
+    
+    @staticmethod
+    def _size_bounded_batches(bodies: list[str]) -> list[list[str]]:
+        """
+        Group message bodies, in order, into batches that respect both the
+        10-entry and the 256 KiB per-call limits. A body that is too large on
+        its own still gets a batch of one, so SQS reports it as failed
+        instead of failing its neighbours.
+        """
+        batches: list[list[str]] = []
+        batch: list[str] = []
+        batch_bytes = 0
+        for body in bodies:
+            size = len(body.encode())
+            if batch and (len(batch) == SQS_MAX_BATCH_SIZE or batch_bytes + size > SQS_MAX_BATCH_BYTES):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(body)
+            batch_bytes += size
+        if batch:
+            batches.append(batch)
+        return batches
+    
     def consume(self, queue_name: str, max_messages: int = 10) -> list[dict[str, Any]]:
         try:
             queue_url = self._get_queue_url(queue_name)
             response = self.client.receive_message(
                 QueueUrl=queue_url,
                 MaxNumberOfMessages=min(max_messages, 10),
-                WaitTimeSeconds=5,
+                WaitTimeSeconds=self.wait_time_seconds,
+                AttributeNames=["ApproximateReceiveCount", "SentTimestamp"],
             )
             
             messages = response.get("Messages", [])
             result = []
             for msg in messages:
+                attributes = msg.get("Attributes", {})
                 result.append({
                     "message_id": msg["MessageId"],
                     "receipt_handle": msg["ReceiptHandle"],
-                    "body": json.loads(msg["Body"]),
+                    "body": jsonlib.loads(msg["Body"]),
+                    "receive_count": int(attributes.get("ApproximateReceiveCount", 1)),
+                    "sent_timestamp": int(attributes["SentTimestamp"]) if "SentTimestamp" in attributes else None,
                 })
             return result
         except Exception as e:
+            self._forget_queue_url(queue_name, e)
             logger.error(f"Failed to consume from SQS queue {queue_name}: {e}")
             return []
     
@@ -74,9 +175,43 @@ class SQSQueue(EventQueue):
             logger.info(f"Deleted message from SQS queue {queue_name}")
             return True
         except Exception as e:
+            self._forget_queue_url(queue_name, e)
             logger.error(f"Failed to delete message from SQS: {e}")
             return False
     
+    def delete_messages_batch(self, queue_name: str, receipt_handles: list[str]) -> list[bool]:
+        if not receipt_handles:
+            return []
+        try:
+            queue_url = self._get_queue_url(queue_name)
+        except Exception as e:
+            self._forget_queue_url(queue_name, e)
+            logger.error(f"Failed to delete message batch from SQS: {e}")
+            return [False] * len(receipt_handles)
+        
+        results = []
+        for start in range(0, len(receipt_handles), SQS_MAX_BATCH_SIZE):
+            batch = receipt_handles[start:start + SQS_MAX_BATCH_SIZE]
+            try:
+                response = self.client.delete_message_batch(
+                    QueueUrl=queue_url,
+                    Entries=[
+                        {"Id": str(i), "ReceiptHandle": handle}
+                        for i, handle in enumerate(batch)
+                    ],
+                )
+                failed_ids = {entry["Id"] for entry in response.get("Failed", [])}
+                results.extend(str(i) not in failed_ids for i in range(len(batch)))
+                logger.info(
+                    f"Deleted message batch from SQS queue {queue_name}",
+                    extra={"deleted": len(batch) - len(failed_ids), "failed": len(failed_ids)},
+                )
+            except Exception as e:
+                self._forget_queue_url(queue_name, e)
+                logger.error(f"Failed to delete message batch from SQS: {e}")
+                results.extend([False] * len(batch))
+        return results
+    
     def get_queue_size(self, queue_name: str) -> int:
         try:
             queue_url = self._get_queue_url(queue_name)
@@ -86,5 +221,6 @@ class SQSQueue(EventQueue):
             )
             return int(response["Attributes"]["ApproximateNumberOfMessages"])
         except Exception as e:
+            self._forget_queue_url(queue_name, e)
             logger.error(f"Failed to get queue size: {e}")
             return 0
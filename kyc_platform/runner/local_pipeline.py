@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import json
 import base64
+import hashlib
 import sys
 import os
 from pathlib import Path
@@ -14,25 +15,39 @@ from kyc_platform.workers.ocr_passport import handler as passport_handler
 from kyc_platform.persistence import get_repository
 
 
+TEST_IMAGE_SIZE = (800, 600)
+
+TEST_IMAGE_TEXT = (
+    ((100, 100), "REPUBLICA ARGENTINA", "blue"),
+    ((100, 150), "DOCUMENTO NACIONAL DE IDENTIDAD", "black"),
+    ((100, 220), "Apellido: PEREZ", "black"),
+    ((100, 260), "Nombre: JUAN CARLOS", "black"),
+    ((100, 300), "DNI: 30123456", "black"),
+    ((100, 340), "Fecha Nacimiento: 15/03/1985", "black"),
+    ((100, 380), "Sexo: M", "black"),
+    ((100, 420), "Nacionalidad: ARGENTINA", "black"),
+)
+
+
 def create_test_image() -> str:
+    # The file name carries a digest of the drawing spec, so an image from a
+    # previous run is reused as long as the spec has not changed.
+    spec_digest = hashlib.blake2b(repr((TEST_IMAGE_SIZE, TEST_IMAGE_TEXT)).encode(), digest_size=8).hexdigest()
+    test_path = os.path.join(config.UPLOAD_DIR, f"test_dni_{spec_digest}.jpg")
+    if os.path.exists(test_path):
+        return test_path
+    
     from PIL import Image, ImageDraw
     
     os.makedirs(config.UPLOAD_DIR, exist_ok=True)
     
-    img = Image.new("RGB", (800, 600), color="white")
+    img = Image.new("RGB", TEST_IMAGE_SIZE, color="white")
     draw = ImageDraw.Draw(img)
     
     draw.rectangle([50, 50, 750, 550], outline="black", width=2)
-    draw.text((100, 100), "REPUBLICA ARGENTINA", fill="blue")
-    draw.text((100, 150), "DOCUMENTO NACIONAL DE IDENTIDAD", fill="black")
-    draw.text((100, 220), "Apellido: PEREZ", fill="black")
-    draw.text((100, 260), "Nombre: JUAN CARLOS", fill="black")
-    draw.text((100, 300), "DNI: 30123456", fill="black")
-    draw.text((100, 340), "Fecha Nacimiento: 15/03/1985", fill="black")
-    draw.text((100, 380), "Sexo: M", fill="black")
-    draw.text((100, 420), "Nacionalidad: ARGENTINA", fill="black")
-    
-    test_path = os.path.join(config.UPLOAD_DIR, "test_dni.jpg")
+    for xy, text, fill in TEST_IMAGE_TEXT:
+        draw.text(xy, text, fill=fill)
+    
     img.save(test_path)
     
     return test_path
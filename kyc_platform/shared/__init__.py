@@ -1,4 +1,5 @@
+from kyc_platform.shared.clock import utc_now_iso
 from kyc_platform.shared.config import config, Config, Environment, DocumentType
 from kyc_platform.shared.logging import get_logger, log_with_context
 
-__all__ = ["config", "Config", "Environment", "DocumentType", "get_logger", "log_with_context"]
+__all__ = ["config", "Config", "Environment", "DocumentType", "get_logger", "log_with_context", "utc_now_iso"]
@@ -0,0 +1,20 @@
+import time
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") for the most recent call; swapped as a
+# single tuple so concurrent callers never pair a prefix with the wrong second.
+_second_prefix: tuple[int, str] = (-1, "")
+
+
+def utc_now_iso() -> str:
+    """
+    Current UTC time as "YYYY-MM-DDTHH:MM:SS.ffffff", the format of
+    datetime.utcnow().isoformat() (except that microseconds are always
+    present). The date/time prefix is formatted at most once per second.
+    """
+    global _second_prefix
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_second, prefix = _second_prefix
+    if seconds != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _second_prefix = (seconds, prefix)
+    return f"{prefix}.{nanos // 1000:06d}"
@@ -24,6 +24,12 @@ class Config:
     QUEUE_EXTRACTED_NAME: str = os.getenv("QUEUE_EXTRACTED_NAME", f"{SERVICE_PREFIX}-extracted")
     QUEUE_WEBHOOK_NAME: str = os.getenv("QUEUE_WEBHOOK_NAME", f"{SERVICE_PREFIX}-webhook")
     
+    QUEUE_NAME_BY_DOCUMENT_TYPE: dict[DocumentType, str] = {
+        DocumentType.DNI: QUEUE_DNI_NAME,
+        DocumentType.PASSPORT: QUEUE_PASSPORT_NAME,
+        DocumentType.LICENSE: QUEUE_LICENSE_NAME,
+    }
+    
     LAMBDA_HANDLER_NAME: str = os.getenv("LAMBDA_HANDLER_NAME", f"{SERVICE_PREFIX}-handler-documents")
     LAMBDA_OCR_DNI_NAME: str = os.getenv("LAMBDA_OCR_DNI_NAME", f"{SERVICE_PREFIX}-worker-ocr-dni")
     LAMBDA_OCR_PASSPORT_NAME: str = os.getenv("LAMBDA_OCR_PASSPORT_NAME", f"{SERVICE_PREFIX}-worker-ocr-passport")
@@ -33,16 +39,23 @@ class Config:
     SQLITE_DB_PATH: str = os.getenv("SQLITE_DB_PATH", "./data/kyc.db")
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "./data/uploads")
     
+    SQS_WAIT_TIME_SECONDS: int = int(os.getenv("SQS_WAIT_TIME_SECONDS", "20"))
+    
+    MAX_IMAGE_B64_LEN: int = int(os.getenv("MAX_IMAGE_B64_LEN", str(12 * 1024 * 1024)))
+    MAX_IMAGE_PIXELS: int = int(os.getenv("MAX_IMAGE_PIXELS", str(40_000_000)))
+    MAX_BATCH_SIZE: int = int(os.getenv("MAX_BATCH_SIZE", "10"))
+    
+    LIVENESS_WORKERS: int = int(os.getenv("LIVENESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+    
+    IDEMPOTENCY_HASH_VERSION: int = int(os.getenv("IDEMPOTENCY_HASH_VERSION", "1"))
+    
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
+    
     @classmethod
     def get_queue_name_for_document_type(cls, document_type: DocumentType) -> str:
-        mapping = {
-            DocumentType.DNI: cls.QUEUE_DNI_NAME,
-            DocumentType.PASSPORT: cls.QUEUE_PASSPORT_NAME,
-            DocumentType.LICENSE: cls.QUEUE_LICENSE_NAME,
-        }
-        return mapping[document_type]
+        return cls.QUEUE_NAME_BY_DOCUMENT_TYPE[document_type]
     
     @classmethod
     def is_local(cls) -> bool:
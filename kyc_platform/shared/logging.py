@@ -1,28 +1,37 @@
+import json
 import logging
 import sys
-import json
-from datetime import datetime
 from typing import Any
 
+from kyc_platform.shared import jsonlib
+from kyc_platform.shared.clock import utc_now_iso
 from kyc_platform.shared.config import config
 
+_MISSING = object()
+
 
 class StructuredFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utc_now_iso(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
         
-        if hasattr(record, "extra_data"):
-            log_data["data"] = record.extra_data
+        extra_data = getattr(record, "extra_data", _MISSING)
+        if extra_data is not _MISSING:
+            log_data["data"] = extra_data
             
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
-            
-        return json.dumps(log_data)
+        
+        try:
+            return jsonlib.dumps(log_data)
+        except TypeError:
+            # Context values that are not JSON types (paths, exceptions, ...)
+            # are logged as their str() instead of failing the log call.
+            return json.dumps(log_data, default=str, ensure_ascii=False, separators=(",", ":"))
 
 
 def get_logger(name: str) -> logging.Logger:
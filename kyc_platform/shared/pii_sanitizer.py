@@ -15,9 +15,12 @@ ALWAYS log:
 - Counts and lengths
 """
 
+import functools
 import hashlib
 import re
-from typing import Any, Optional
+from typing import Any, Callable, Optional
+
+_NON_DIGITS = re.compile(r"[^0-9]")
 
 
 def hash_truncated(value: str, length: int = 8) -> str:
@@ -32,7 +35,7 @@ def mask_document_number(doc_number: Optional[str]) -> str:
     """Mask document number, showing only last 3 digits."""
     if not doc_number:
         return "***"
-    clean = re.sub(r"[^0-9]", "", doc_number)
+    clean = _NON_DIGITS.sub("", doc_number)
     if len(clean) <= 3:
         return "***"
     return f"***{clean[-3:]}"
@@ -42,7 +45,7 @@ def mask_cuil(cuil: Optional[str]) -> str:
     """Mask CUIL/CUIT, showing only verification digit."""
     if not cuil:
         return "**-********-*"
-    clean = re.sub(r"[^0-9]", "", cuil)
+    clean = _NON_DIGITS.sub("", cuil)
     if len(clean) < 2:
         return "**-********-*"
     return f"**-********-{clean[-1]}"
@@ -72,6 +75,51 @@ def mask_base64_image(image_base64: Optional[str]) -> str:
     return f"[IMAGE:{size_kb}KB, hash:{hash_truncated(image_base64)}]"
 
 
+def _mask_tramite(tramite: Optional[str]) -> str:
+    return f"***{tramite[-4:]}" if tramite and len(tramite) > 4 else "***"
+
+
+def _mask_name(name: Optional[str]) -> Optional[str]:
+    return f"{name[0]}***" if name else None
+
+
+def _mask_other(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > 20:
+        return f"[{len(value)} chars]"
+    return value
+
+
+def _keep(value: Any) -> Any:
+    return value
+
+
+SENSITIVE_FIELD_MASKS = {
+    "numero_documento": mask_document_number,
+    "numero_pasaporte": mask_document_number,
+    "cuil": mask_cuil,
+    "mrz_line1": mask_mrz_line,
+    "mrz_line2": mask_mrz_line,
+    "pdf417_raw": mask_pdf417,
+    "tramite": _mask_tramite,
+    "apellido": _mask_name,
+    "nombre": _mask_name,
+}
+
+SAFE_FIELDS = frozenset({
+    "sexo", "nacionalidad", "codigo_pais", "ejemplar",
+})
+
+
+@functools.lru_cache(maxsize=512)
+def _extracted_field_mask(key: str) -> Callable[[Any], Any]:
+    """Masking function for an extracted_data field, resolved once per key name."""
+    if key in SENSITIVE_FIELD_MASKS:
+        return SENSITIVE_FIELD_MASKS[key]
+    if key in SAFE_FIELDS or "fecha" in key.lower():
+        return _keep
+    return _mask_other
+
+
 def sanitize_extracted_data(data: dict[str, Any]) -> dict[str, Any]:
     """
     Sanitize extracted data for safe logging.
@@ -81,41 +129,28 @@ def sanitize_extracted_data(data: dict[str, Any]) -> dict[str, Any]:
     if not data:
         return {}
     
-    sanitized = {}
-    
-    sensitive_fields = {
-        "numero_documento": mask_document_number,
-        "numero_pasaporte": mask_document_number,
-        "cuil": mask_cuil,
-        "mrz_line1": mask_mrz_line,
-        "mrz_line2": mask_mrz_line,
-        "pdf417_raw": mask_pdf417,
-        "tramite": lambda x: f"***{x[-4:]}" if x and len(x) > 4 else "***",
-    }
-    
-    safe_fields = {
-        "sexo", "nacionalidad", "codigo_pais", "ejemplar",
-    }
-    
-    for key, value in data.items():
-        if key in sensitive_fields:
-            sanitized[key] = sensitive_fields[key](value)
-        elif key in safe_fields:
-            sanitized[key] = value
-        elif "fecha" in key.lower():
-            sanitized[key] = value
-        elif key in ("apellido", "nombre"):
-            if value:
-                sanitized[key] = f"{value[0]}***" if len(value) > 0 else "***"
-            else:
-                sanitized[key] = None
-        else:
-            if isinstance(value, str) and len(value) > 20:
-                sanitized[key] = f"[{len(value)} chars]"
-            else:
-                sanitized[key] = value
-    
-    return sanitized
+    return {key: _extracted_field_mask(key)(value) for key, value in data.items()}
+
+
+def _mask_frames(frames: Optional[list[str]]) -> Optional[str]:
+    # Liveness frames are base64 images; hashing each one for a log line
+    # would cost more than the request, so only the count is kept.
+    return f"[{len(frames)} frames]" if frames else None
+
+
+def _sanitize_extracted_field(value: Any) -> Any:
+    return sanitize_extracted_data(value) if isinstance(value, dict) else value
+
+
+EVENT_FIELD_MASKS = {
+    "image": mask_base64_image,
+    "image_base64": mask_base64_image,
+    "frames": _mask_frames,
+    "extracted_data": _sanitize_extracted_field,
+    "pdf417_raw": mask_pdf417,
+    "mrz_line1": mask_mrz_line,
+    "mrz_line2": mask_mrz_line,
+}
 
 
 def sanitize_event_for_logging(event: dict[str, Any]) -> dict[str, Any]:
@@ -123,7 +158,7 @@ def sanitize_event_for_logging(event: dict[str, Any]) -> dict[str, Any]:
     Sanitize an event payload for safe logging.
     
     Removes or masks:
-    - image / image_ref content
+    - image / frames content (image_ref is kept)
     - extracted_data sensitive fields
     - Any base64 content
     """
@@ -133,16 +168,8 @@ def sanitize_event_for_logging(event: dict[str, Any]) -> dict[str, Any]:
     sanitized = {}
     
     for key, value in event.items():
-        if key in ("image", "image_base64"):
-            sanitized[key] = mask_base64_image(value)
-        elif key == "image_ref":
-            sanitized[key] = value
-        elif key == "extracted_data" and isinstance(value, dict):
-            sanitized[key] = sanitize_extracted_data(value)
-        elif key in ("pdf417_raw", "mrz_line1", "mrz_line2"):
-            sanitized[key] = mask_mrz_line(value) if "mrz" in key else mask_pdf417(value)
-        else:
-            sanitized[key] = value
+        mask = EVENT_FIELD_MASKS.get(key)
+        sanitized[key] = mask(value) if mask is not None else value
     
     return sanitized
 
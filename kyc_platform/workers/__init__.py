@@ -1,3 +1,12 @@
+from PIL import Image
+
+from kyc_platform.shared.config import config
+
+# Every worker imports through this package, so the decompression-bomb limit
+# is set before any image is opened. PIL warns past the limit and raises past
+# twice it.
+Image.MAX_IMAGE_PIXELS = config.MAX_IMAGE_PIXELS
+
 from kyc_platform.workers.ocr_dni import handler as dni_handler
 from kyc_platform.workers.ocr_passport import handler as passport_handler
 from kyc_platform.workers.webhook_dispatcher import handler as webhook_handler
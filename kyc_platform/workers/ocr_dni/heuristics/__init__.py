@@ -1,3 +1,4 @@
+from kyc_platform.workers.ocr_dni.heuristics.image_context import ImageContext
 from kyc_platform.workers.ocr_dni.heuristics.dni_heuristic_analyzer import DniHeuristicAnalyzer
 from kyc_platform.workers.ocr_dni.heuristics.authenticity_analyzer import (
     AuthenticityAnalyzer,
@@ -9,6 +10,7 @@ from kyc_platform.workers.ocr_dni.heuristics.document_liveness_analyzer import (
 )
 
 __all__ = [
+    "ImageContext",
     "DniHeuristicAnalyzer",
     "AuthenticityAnalyzer",
     "authenticity_analyzer",
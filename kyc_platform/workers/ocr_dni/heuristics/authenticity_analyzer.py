@@ -1,5 +1,6 @@
+import functools
 import numpy as np
-from typing import Any
+from typing import Any, Optional
 from PIL import Image
 
 try:
@@ -9,10 +10,59 @@ except ImportError:
     cv2 = None
     cv2_available = False
 
+try:
+    # Same pocketfft transform as numpy.fft, but able to split the rows of a
+    # 2-D transform across all cores.
+    from scipy import fft as fft_backend
+    FFT_KWARGS = {"workers": -1}
+except ImportError:
+    fft_backend = np.fft
+    FFT_KWARGS = {}
+
 from kyc_platform.shared.logging import get_logger
+from kyc_platform.workers.ocr_dni.heuristics.image_context import ImageContext
 
 logger = get_logger(__name__)
 
+GLARE_HSV_LOWER = np.array([0, 0, 231], dtype=np.uint8)
+GLARE_HSV_UPPER = np.array([255, 29, 255], dtype=np.uint8)
+# S / 255 < 0.1 holds exactly for S <= 25.
+LOW_SATURATION_HSV_LOWER = np.array([0, 0, 0], dtype=np.uint8)
+LOW_SATURATION_HSV_UPPER = np.array([255, 25, 255], dtype=np.uint8)
+
+
+@functools.lru_cache(maxsize=32)
+def _moire_band_weights(rows: int, cols: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Weights that turn sums over an rfft2 half-spectrum into the sums over the
+    full centred fft2 spectrum the moire score is defined on.
+    
+    The mid-frequency annulus is rasterised on the centred grid exactly as
+    before, then moved to unshifted coordinates. Each rfft column v other
+    than 0 (and cols/2) also stands for its conjugate column -v, whose
+    magnitudes equal those at (-u, v), so it picks up that point's mask value
+    too. Normalized images share a width, so a few shapes cover all calls.
+    """
+    mask = np.zeros((rows, cols), np.uint8)
+    r_inner = min(rows, cols) // 8
+    r_outer = min(rows, cols) // 3
+    cv2.circle(mask, (cols // 2, rows // 2), r_outer, 1, -1)
+    cv2.circle(mask, (cols // 2, rows // 2), r_inner, 0, -1)
+    mask = np.fft.ifftshift(mask).astype(np.float64)
+    
+    half = cols // 2 + 1
+    mirrored = np.roll(mask[::-1, ::-1], (1, 1), axis=(0, 1))
+    band = mask[:, :half] + mirrored[:, :half]
+    total = np.full((rows, half), 2.0)
+    
+    self_paired = [0, cols // 2] if cols % 2 == 0 else [0]
+    band[:, self_paired] = mask[:, self_paired]
+    total[:, self_paired] = 1.0
+    
+    band.setflags(write=False)
+    total.setflags(write=False)
+    return band, total
+
 
 class AuthenticityAnalyzer:
     
@@ -25,69 +75,99 @@ class AuthenticityAnalyzer:
             "moire_threshold": 0.3,
         }
     
-    def analyze(self, image: Image.Image) -> dict[str, Any]:
+    def analyze(self, image: Image.Image, context: Optional[ImageContext] = None) -> dict[str, Any]:
         if not cv2_available:
             logger.warning("OpenCV not available, skipping authenticity analysis")
             return self._empty_result()
         
         try:
-            img_array = np.array(image.convert("RGB"))
-            img_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+            if context is not None and context.is_color:
+                # Same pixels as `image`, already converted by the caller.
+                gray = context.gray
+                hsv = context.hsv
+            else:
+                img_rgb = np.array(image.convert("RGB"))
+                # Each color space is produced once, straight from RGB, and shared
+                # by the metric helpers below.
+                gray = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY)
+                hsv = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2HSV)
             
-            saturation = self._analyze_saturation(img_bgr)
-            sharpness = self._analyze_sharpness(img_bgr)
-            glare = self._analyze_glare(img_bgr)
-            moire = self._analyze_moire(img_bgr)
-            
-            flags = self._generate_flags(saturation, sharpness, glare, moire)
-            score = self._calculate_score(saturation, sharpness, glare, moire)
+            return self._analyze_color_spaces(gray, hsv)
+        except Exception as e:
+            logger.error(f"Authenticity analysis failed: {e}")
+            return self._empty_result()
+    
+    def analyze_bgr(self, image: np.ndarray, context: Optional[ImageContext] = None) -> dict[str, Any]:
+        """
+        analyze() for an OpenCV BGR array (e.g. from cv2.imread), reading the
+        gray/HSV planes straight from it instead of going through PIL and RGB.
+        """
+        if not cv2_available:
+            logger.warning("OpenCV not available, skipping authenticity analysis")
+            return self._empty_result()
+        
+        try:
+            if context is None or not context.is_color:
+                if image.ndim == 2:
+                    image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+                context = ImageContext(image)
             
-            return {
-                "authenticity_score": round(score, 2),
-                "metrics": {
-                    "saturation": round(saturation["mean"], 3),
-                    "sharpness": round(sharpness["variance"], 2),
-                    "glare_ratio": round(glare["ratio"], 3),
-                    "moire_score": round(moire["score"], 3),
-                },
-                "flags": flags,
-                "is_likely_authentic": len(flags) == 0,
-            }
+            return self._analyze_color_spaces(context.gray, context.hsv)
         except Exception as e:
             logger.error(f"Authenticity analysis failed: {e}")
             return self._empty_result()
     
-    def _analyze_saturation(self, img_bgr: np.ndarray) -> dict[str, float]:
-        hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
-        saturation_channel = hsv[:, :, 1] / 255.0
+    def _analyze_color_spaces(self, gray: np.ndarray, hsv: np.ndarray) -> dict[str, Any]:
+        saturation = self._analyze_saturation(hsv)
+        sharpness = self._analyze_sharpness(gray)
+        glare = self._analyze_glare(gray, hsv)
+        moire = self._analyze_moire(gray)
+        
+        flags = self._generate_flags(saturation, sharpness, glare, moire)
+        score = self._calculate_score(saturation, sharpness, glare, moire)
         
         return {
-            "mean": float(np.mean(saturation_channel)),
-            "std": float(np.std(saturation_channel)),
-            "low_ratio": float(np.sum(saturation_channel < 0.1) / saturation_channel.size),
+            "authenticity_score": round(score, 2),
+            "metrics": {
+                "saturation": round(saturation["mean"], 3),
+                "sharpness": round(sharpness["variance"], 2),
+                "glare_ratio": round(glare["ratio"], 3),
+                "moire_score": round(moire["score"], 3),
+            },
+            "flags": flags,
+            "is_likely_authentic": len(flags) == 0,
         }
     
-    def _analyze_sharpness(self, img_bgr: np.ndarray) -> dict[str, float]:
-        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        variance = float(laplacian.var())
+    def _analyze_saturation(self, hsv: np.ndarray) -> dict[str, float]:
+        # One pass for both moments of S, scaled to 0..1 afterwards.
+        mean, std_dev = cv2.meanStdDev(hsv[:, :, 1])
+        low_saturation = cv2.inRange(hsv, LOW_SATURATION_HSV_LOWER, LOW_SATURATION_HSV_UPPER)
+        
+        return {
+            "mean": float(mean[0, 0]) / 255.0,
+            "std": float(std_dev[0, 0]) / 255.0,
+            "low_ratio": cv2.countNonZero(low_saturation) / low_saturation.size,
+        }
+    
+    def _analyze_sharpness(self, gray: np.ndarray) -> dict[str, float]:
+        # The 3x3 aperture on uint8 input stays within +-1020, so int16 holds
+        # the Laplacian exactly; meanStdDev accumulates in double.
+        laplacian = cv2.Laplacian(gray, cv2.CV_16S)
+        _, std_dev = cv2.meanStdDev(laplacian)
+        variance = float(std_dev[0, 0]) ** 2
         
         return {
             "variance": variance,
             "is_sharp": variance > self.thresholds["laplacian_min"],
         }
     
-    def _analyze_glare(self, img_bgr: np.ndarray) -> dict[str, float]:
-        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-        
-        _, bright_mask = cv2.threshold(gray, 240, 255, cv2.THRESH_BINARY)
-        bright_pixels = np.sum(bright_mask > 0)
+    def _analyze_glare(self, gray: np.ndarray, hsv: np.ndarray) -> dict[str, float]:
+        # inRange bounds are inclusive: gray > 240, and S < 30 with V > 230.
         total_pixels = gray.size
-        bright_ratio = bright_pixels / total_pixels
+        bright_ratio = cv2.countNonZero(cv2.inRange(gray, 241, 255)) / total_pixels
         
-        hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
-        low_sat_high_val = (hsv[:, :, 1] < 30) & (hsv[:, :, 2] > 230)
-        glare_ratio = float(np.sum(low_sat_high_val) / total_pixels)
+        low_sat_high_val = cv2.inRange(hsv, GLARE_HSV_LOWER, GLARE_HSV_UPPER)
+        glare_ratio = float(cv2.countNonZero(low_sat_high_val) / total_pixels)
         
         return {
             "ratio": glare_ratio,
@@ -95,24 +175,15 @@ class AuthenticityAnalyzer:
             "has_glare": glare_ratio > 0.02,
         }
     
-    def _analyze_moire(self, img_bgr: np.ndarray) -> dict[str, float]:
-        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-        
-        f_transform = np.fft.fft2(gray)
-        f_shift = np.fft.fftshift(f_transform)
-        magnitude = np.abs(f_shift)
-        
-        rows, cols = gray.shape
-        crow, ccol = rows // 2, cols // 2
-        
-        mask = np.zeros((rows, cols), np.uint8)
-        r_inner = min(rows, cols) // 8
-        r_outer = min(rows, cols) // 3
-        cv2.circle(mask, (ccol, crow), r_outer, 1, -1)
-        cv2.circle(mask, (ccol, crow), r_inner, 0, -1)
+    def _analyze_moire(self, gray: np.ndarray) -> dict[str, float]:
+        # The spectrum of a real image is conjugate-symmetric, so the real FFT
+        # (half the columns) plus symmetry weights gives the same sums as the
+        # full complex FFT.
+        magnitude = np.abs(fft_backend.rfft2(gray, **FFT_KWARGS))
+        band_weights, total_weights = _moire_band_weights(*gray.shape)
         
-        mid_freq_energy = np.sum(magnitude * mask)
-        total_energy = np.sum(magnitude)
+        mid_freq_energy = np.vdot(magnitude, band_weights)
+        total_energy = np.vdot(magnitude, total_weights)
         
         moire_score = mid_freq_energy / total_energy if total_energy > 0 else 0
         
@@ -207,8 +278,13 @@ class CombinedAuthenticityAnalyzer:
         cv_image: np.ndarray = None,
         side: str = "front",
         use_template: bool = True,
+        context: Optional[ImageContext] = None,
     ) -> dict[str, Any]:
-        basic_result = self.basic_analyzer.analyze(image)
+        if cv_image is not None:
+            # cv_image holds the same pixels as `image`; read it directly.
+            basic_result = self.basic_analyzer.analyze_bgr(cv_image, context=context)
+        else:
+            basic_result = self.basic_analyzer.analyze(image, context=context)
         
         template_result = None
         if use_template and cv_image is not None and cv2_available:
@@ -2,8 +2,10 @@ import re
 import cv2
 import numpy as np
 from dataclasses import dataclass, field
+from typing import Optional
 
 from kyc_platform.shared.logging import get_logger
+from kyc_platform.workers.ocr_dni.heuristics.image_context import ImageContext
 
 logger = get_logger(__name__)
 
@@ -13,20 +15,25 @@ DNI_FRONT_THRESHOLD = 0.60
 DNI_OLD_THRESHOLD = 0.60
 
 
+def _round_score(score: Optional[float]) -> Optional[float]:
+    return None if score is None else round(score, 3)
+
+
 @dataclass
 class HeuristicSignals:
     pdf417_score: float = 0.0
     mrz_score: float = 0.0
-    dni_front_score: float = 0.0
-    dni_old_score: float = 0.0
+    # None when the cascade decided the variant before the detector ran.
+    dni_front_score: Optional[float] = None
+    dni_old_score: Optional[float] = None
     notes: list = field(default_factory=list)
     
     def to_dict(self) -> dict:
         return {
             "pdf417_score": round(self.pdf417_score, 3),
             "mrz_score": round(self.mrz_score, 3),
-            "dni_front_score": round(self.dni_front_score, 3),
-            "dni_old_score": round(self.dni_old_score, 3),
+            "dni_front_score": _round_score(self.dni_front_score),
+            "dni_old_score": _round_score(self.dni_old_score),
             "notes": self.notes,
         }
 
@@ -52,8 +59,12 @@ class DniHeuristicAnalyzer:
         self._skin_upper_hsv = np.array([20, 255, 255], dtype=np.uint8)
         self._skin_lower_ycrcb = np.array([0, 135, 85], dtype=np.uint8)
         self._skin_upper_ycrcb = np.array([255, 180, 135], dtype=np.uint8)
+        # S > 100 and V > 180; inRange bounds are inclusive.
+        self._hologram_lower_hsv = np.array([0, 101, 181], dtype=np.uint8)
+        self._hologram_upper_hsv = np.array([255, 255, 255], dtype=np.uint8)
+        self._mrz_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 3))
     
-    def analyze(self, image: np.ndarray) -> HeuristicResult:
+    def analyze(self, image: np.ndarray, context: Optional[ImageContext] = None) -> HeuristicResult:
         if image is None or image.size == 0:
             return HeuristicResult(
                 document_variant="unknown",
@@ -61,23 +72,31 @@ class DniHeuristicAnalyzer:
                 signals=HeuristicSignals(notes=["Invalid input image"]),
             )
         
+        if context is None:
+            context = ImageContext(image)
+        
         signals = HeuristicSignals()
         
-        signals.pdf417_score = self._detect_pdf417(image)
+        signals.pdf417_score = self._detect_pdf417(context)
         if signals.pdf417_score >= PDF417_THRESHOLD:
             signals.notes.append("PDF417 barcode detected")
         
-        signals.mrz_score = self._detect_mrz_geometry(image)
+        # The MRZ score always runs: DNIProcessor reads it to pick the side.
+        signals.mrz_score = self._detect_mrz_geometry(context)
         if signals.mrz_score >= MRZ_THRESHOLD:
             signals.notes.append("MRZ geometry detected")
         
-        signals.dni_front_score = self._detect_dni_front(image)
-        if signals.dni_front_score >= DNI_FRONT_THRESHOLD:
-            signals.notes.append("DNI front features detected")
-        
-        signals.dni_old_score = self._detect_dni_old(image)
-        if signals.dni_old_score >= DNI_OLD_THRESHOLD:
-            signals.notes.append("DNI old format detected")
+        # _decide_variant takes the first detector over its threshold in this
+        # order, so the costlier front/old detectors only run while no earlier
+        # one has decided the variant; skipped detectors keep a None score.
+        if signals.pdf417_score < PDF417_THRESHOLD and signals.mrz_score < MRZ_THRESHOLD:
+            signals.dni_front_score = self._detect_dni_front(context)
+            if signals.dni_front_score >= DNI_FRONT_THRESHOLD:
+                signals.notes.append("DNI front features detected")
+            else:
+                signals.dni_old_score = self._detect_dni_old(context)
+                if signals.dni_old_score >= DNI_OLD_THRESHOLD:
+                    signals.notes.append("DNI old format detected")
         
         document_variant, confidence = self._decide_variant(signals)
         
@@ -87,17 +106,17 @@ class DniHeuristicAnalyzer:
             signals=signals,
         )
     
-    def _detect_pdf417(self, image: np.ndarray) -> float:
-        h, w = image.shape[:2]
+    def _detect_pdf417(self, context: ImageContext) -> float:
+        h, w = context.bgr.shape[:2]
         
         roi_x = int(w * 0.55)
         roi_y = int(h * 0.50)
-        roi = image[roi_y:, roi_x:]
+        roi = context.bgr[roi_y:, roi_x:]
         
         if roi.size == 0:
             return 0.0
         
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if len(roi.shape) == 3 else roi
+        gray = context.gray[roi_y:, roi_x:]
         
         _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         
@@ -121,8 +140,9 @@ class DniHeuristicAnalyzer:
         if total_pixels == 0:
             return 0.0
         
-        black_pixels = np.sum(binary == 0)
-        white_pixels = np.sum(binary == 255)
+        # Otsu output is strictly 0/255.
+        white_pixels = cv2.countNonZero(binary)
+        black_pixels = total_pixels - white_pixels
         
         if max(black_pixels, white_pixels) == 0:
             return 0.0
@@ -137,17 +157,12 @@ class DniHeuristicAnalyzer:
         if binary.shape[0] < 10 or binary.shape[1] < 20:
             return 0.0
         
-        transitions = []
         sample_rows = min(50, binary.shape[0])
         
-        for row in range(sample_rows):
-            row_data = binary[row, :]
-            diff = np.abs(np.diff(row_data.astype(np.int16)))
-            transition_count = np.sum(diff > 127)
-            transitions.append(transition_count)
-        
-        if not transitions:
-            return 0.0
+        # Binary rows only hold 0/255, so a transition is any change between
+        # neighbouring pixels; count them for all sampled rows at once.
+        sample = binary[:sample_rows]
+        transitions = np.count_nonzero(sample[:, 1:] != sample[:, :-1], axis=1)
         
         avg_transitions = np.mean(transitions)
         std_transitions = np.std(transitions)
@@ -185,21 +200,20 @@ class DniHeuristicAnalyzer:
         else:
             return 0.2
     
-    def _detect_mrz_geometry(self, image: np.ndarray) -> float:
-        h, w = image.shape[:2]
+    def _detect_mrz_geometry(self, context: ImageContext) -> float:
+        h, w = context.bgr.shape[:2]
         
         roi_y = int(h * 0.70)
-        roi = image[roi_y:, :]
+        roi = context.bgr[roi_y:, :]
         
         if roi.size == 0:
             return 0.0
         
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if len(roi.shape) == 3 else roi
+        gray = context.gray[roi_y:, :]
         
         _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
         
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 3))
-        dilated = cv2.dilate(binary, kernel, iterations=2)
+        dilated = cv2.dilate(binary, self._mrz_kernel, iterations=2)
         
         contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
@@ -230,7 +244,8 @@ class DniHeuristicAnalyzer:
         
         return 0.0
     
-    def _detect_dni_front(self, image: np.ndarray) -> float:
+    def _detect_dni_front(self, context: ImageContext) -> float:
+        image = context.bgr
         h, w = image.shape[:2]
         score = 0.0
         
@@ -239,10 +254,12 @@ class DniHeuristicAnalyzer:
         photo_w = int(w * 0.35)
         photo_h = int(h * 0.65)
         
-        photo_roi = image[photo_y:photo_y+photo_h, photo_x:photo_x+photo_w]
+        photo_rows = slice(photo_y, photo_y + photo_h)
+        photo_cols = slice(photo_x, photo_x + photo_w)
+        photo_roi = image[photo_rows, photo_cols]
         
         if photo_roi.size > 0:
-            skin_score = self._detect_skin_tone(photo_roi)
+            skin_score = self._detect_skin_tone(context, photo_rows, photo_cols)
             if skin_score > 0.15:
                 score += 0.35
             elif skin_score > 0.08:
@@ -257,10 +274,10 @@ class DniHeuristicAnalyzer:
         sig_roi = image[sig_y:, sig_x:]
         
         if sig_roi.size > 0:
-            signature_score = self._detect_signature_texture(sig_roi)
+            signature_score = self._detect_signature_texture(context.gray[sig_y:, sig_x:])
             score += signature_score * 0.20
         
-        hologram_score = self._detect_hologram(image)
+        hologram_score = self._detect_hologram(context)
         score += hologram_score * 0.20
         
         structure_score = self._detect_card_structure(image)
@@ -268,29 +285,28 @@ class DniHeuristicAnalyzer:
         
         return min(1.0, score)
     
-    def _detect_skin_tone(self, image: np.ndarray) -> float:
-        if len(image.shape) != 3:
+    def _detect_skin_tone(self, context: ImageContext, rows: slice, cols: slice) -> float:
+        if not context.is_color:
             return 0.0
         
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        hsv = context.hsv[rows, cols]
         skin_mask_hsv = cv2.inRange(hsv, self._skin_lower_hsv, self._skin_upper_hsv)
         
-        ycrcb = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb)
+        ycrcb = context.ycrcb[rows, cols]
         skin_mask_ycrcb = cv2.inRange(ycrcb, self._skin_lower_ycrcb, self._skin_upper_ycrcb)
         
-        skin_mask = cv2.bitwise_and(skin_mask_hsv, skin_mask_ycrcb)
+        # AND the masks in place and count without a boolean temporary.
+        skin_mask = cv2.bitwise_and(skin_mask_hsv, skin_mask_ycrcb, dst=skin_mask_hsv)
         
-        skin_pixels = np.sum(skin_mask > 0)
-        total_pixels = image.shape[0] * image.shape[1]
+        skin_pixels = cv2.countNonZero(skin_mask)
+        total_pixels = hsv.shape[0] * hsv.shape[1]
         
         return skin_pixels / total_pixels if total_pixels > 0 else 0.0
     
-    def _detect_signature_texture(self, image: np.ndarray) -> float:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
-        
+    def _detect_signature_texture(self, gray: np.ndarray) -> float:
         edges = cv2.Canny(gray, 50, 150)
         
-        edge_density = np.sum(edges > 0) / edges.size if edges.size > 0 else 0
+        edge_density = cv2.countNonZero(edges) / edges.size if edges.size > 0 else 0
         
         if 0.03 < edge_density < 0.20:
             contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -302,16 +318,13 @@ class DniHeuristicAnalyzer:
         
         return 0.0
     
-    def _detect_hologram(self, image: np.ndarray) -> float:
-        if len(image.shape) != 3:
+    def _detect_hologram(self, context: ImageContext) -> float:
+        if not context.is_color:
             return 0.0
         
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        s_channel = hsv[:, :, 1]
-        v_channel = hsv[:, :, 2]
-        
-        high_sat_bright = (s_channel > 100) & (v_channel > 180)
-        ratio = np.sum(high_sat_bright) / (image.shape[0] * image.shape[1])
+        hsv = context.hsv
+        high_sat_bright = cv2.inRange(hsv, self._hologram_lower_hsv, self._hologram_upper_hsv)
+        ratio = cv2.countNonZero(high_sat_bright) / (hsv.shape[0] * hsv.shape[1])
         
         if ratio > 0.015:
             return 0.7
@@ -330,13 +343,14 @@ class DniHeuristicAnalyzer:
             return 0.5
         return 0.2
     
-    def _detect_dni_old(self, image: np.ndarray) -> float:
+    def _detect_dni_old(self, context: ImageContext) -> float:
+        image = context.bgr
         h, w = image.shape[:2]
         score = 0.0
         
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+        gray = context.gray
         
-        std_dev = np.std(gray)
+        std_dev = cv2.meanStdDev(gray)[1][0, 0]
         if std_dev < 45:
             score += 0.25
         elif std_dev < 55:
@@ -346,7 +360,7 @@ class DniHeuristicAnalyzer:
         photo_roi = image[:, photo_x:]
         
         if photo_roi.size > 0 and len(photo_roi.shape) == 3:
-            skin_score = self._detect_skin_tone(photo_roi)
+            skin_score = self._detect_skin_tone(context, slice(None), slice(photo_x, None))
             if skin_score > 0.12:
                 score += 0.30
             elif skin_score > 0.06:
@@ -355,7 +369,7 @@ class DniHeuristicAnalyzer:
         text_region = gray[:int(h * 0.6), :int(w * 0.55)]
         if text_region.size > 0:
             edges = cv2.Canny(text_region, 50, 150)
-            edge_density = np.sum(edges > 0) / edges.size
+            edge_density = cv2.countNonZero(edges) / edges.size
             
             if 0.02 < edge_density < 0.15:
                 score += 0.25
@@ -373,17 +387,17 @@ class DniHeuristicAnalyzer:
         if signals.mrz_score >= MRZ_THRESHOLD:
             return "dni_new_front", signals.mrz_score
         
-        if signals.dni_front_score >= DNI_FRONT_THRESHOLD:
+        if signals.dni_front_score is not None and signals.dni_front_score >= DNI_FRONT_THRESHOLD:
             return "dni_new_front", signals.dni_front_score
         
-        if signals.dni_old_score >= DNI_OLD_THRESHOLD:
+        if signals.dni_old_score is not None and signals.dni_old_score >= DNI_OLD_THRESHOLD:
             return "dni_old", signals.dni_old_score
         
         best_score = max(
             signals.pdf417_score,
             signals.mrz_score,
-            signals.dni_front_score,
-            signals.dni_old_score,
+            signals.dni_front_score or 0.0,
+            signals.dni_old_score or 0.0,
         )
         
         return "unknown", best_score
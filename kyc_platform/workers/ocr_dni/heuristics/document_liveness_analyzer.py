@@ -1,8 +1,13 @@
 import numpy as np
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
 from PIL import Image
 import io
-import base64
+
+try:
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
 
 try:
     import cv2
@@ -11,6 +16,7 @@ except ImportError:
     cv2 = None
     cv2_available = False
 
+from kyc_platform.shared.config import config
 from kyc_platform.shared.logging import get_logger
 
 logger = get_logger(__name__)
@@ -45,9 +51,11 @@ class DocumentLivenessAnalyzer:
             if len(frames) < self.min_frames:
                 return self._empty_result("frame_decode_failed")
             
-            reflection_analysis = self._analyze_reflection_changes(frames)
-            hologram_analysis = self._analyze_hologram_regions(frames)
-            motion_analysis = self._analyze_document_motion(frames)
+            grays, highlight_intensities, hue_variances = zip(*self._map_frames(self._frame_features, frames))
+            
+            reflection_analysis = self._analyze_reflection_changes(list(highlight_intensities))
+            hologram_analysis = self._analyze_hologram_regions(list(hue_variances))
+            motion_analysis = self._analyze_document_motion(list(grays))
             
             score = self._calculate_liveness_score(
                 reflection_analysis, hologram_analysis, motion_analysis
@@ -72,31 +80,76 @@ class DocumentLivenessAnalyzer:
             logger.error(f"Document liveness analysis failed: {e}")
             return self._empty_result(f"analysis_error: {str(e)}")
     
+    def _map_frames(self, fn: Callable, items: list) -> list:
+        """
+        Apply fn to every frame, in order. Frames are independent and the
+        decode/OpenCV/NumPy work releases the GIL, so they run on a small
+        thread pool when more than one worker is configured.
+        """
+        workers = min(config.LIVENESS_WORKERS, len(items))
+        if workers <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(fn, items))
+    
     def _decode_frames(self, frames_base64: list[str]) -> list[np.ndarray]:
-        frames = []
-        for i, b64 in enumerate(frames_base64):
-            try:
-                if "," in b64:
-                    b64 = b64.split(",")[1]
-                
-                image_data = base64.b64decode(b64)
-                pil_image = Image.open(io.BytesIO(image_data))
-                img_array = np.array(pil_image.convert("RGB"))
-                img_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-                frames.append(img_bgr)
-            except Exception as e:
-                logger.warning(f"Failed to decode frame {i}: {e}")
-        return frames
+        decoded = self._map_frames(self._decode_frame, list(enumerate(frames_base64)))
+        return [frame for frame in decoded if frame is not None]
+    
+    def _decode_frame(self, indexed_frame: tuple[int, str]) -> Optional[np.ndarray]:
+        i, b64 = indexed_frame
+        try:
+            if "," in b64:
+                b64 = b64.split(",")[1]
+            if len(b64) > config.MAX_IMAGE_B64_LEN:
+                logger.warning(f"Skipping frame {i}: payload too large ({len(b64)} chars)")
+                return None
+            
+            image_data = b64decode(b64)
+            # Opening only parses the header; it applies the MAX_IMAGE_PIXELS
+            # decompression-bomb check before any pixels are decoded.
+            pil_image = Image.open(io.BytesIO(image_data))
+            
+            # OpenCV decodes straight to BGR. Orientation is ignored to
+            # match PIL, which does not apply EXIF rotation either.
+            img_bgr = cv2.imdecode(
+                np.frombuffer(image_data, dtype=np.uint8),
+                cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION,
+            )
+            if img_bgr is not None:
+                return img_bgr
+            
+            img_array = np.array(pil_image.convert("RGB"))
+            return cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+        except Exception as e:
+            logger.warning(f"Failed to decode frame {i}: {e}")
+            return None
     
-    def _analyze_reflection_changes(self, frames: list[np.ndarray]) -> dict[str, Any]:
-        highlight_intensities = []
+    def _frame_features(self, frame: np.ndarray) -> tuple[np.ndarray, float, float]:
+        """Per-frame inputs of the three checks: gray plane, highlight intensity, hologram hue variance."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        _, highlights = cv2.threshold(gray, 220, 255, cv2.THRESH_BINARY)
+        highlight_intensity = np.sum(highlights) / highlights.size
+        
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
         
-        for frame in frames:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            _, highlights = cv2.threshold(gray, 220, 255, cv2.THRESH_BINARY)
-            intensity = np.sum(highlights) / highlights.size
-            highlight_intensities.append(intensity)
+        saturation = hsv[:, :, 1]
+        value = hsv[:, :, 2]
         
+        high_sat_mask = saturation > 100
+        high_val_mask = value > 150
+        hologram_mask = high_sat_mask & high_val_mask
+        
+        if np.any(hologram_mask):
+            hue_in_hologram = hsv[:, :, 0][hologram_mask]
+            hue_variance = float(np.var(hue_in_hologram))
+        else:
+            hue_variance = 0.0
+        
+        return gray, highlight_intensity, hue_variance
+    
+    def _analyze_reflection_changes(self, highlight_intensities: list[float]) -> dict[str, Any]:
         variance = np.var(highlight_intensities)
         mean_change = np.mean(np.abs(np.diff(highlight_intensities)))
         
@@ -107,25 +160,7 @@ class DocumentLivenessAnalyzer:
             "intensities": [float(x) for x in highlight_intensities],
         }
     
-    def _analyze_hologram_regions(self, frames: list[np.ndarray]) -> dict[str, Any]:
-        color_variances = []
-        
-        for frame in frames:
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-            
-            saturation = hsv[:, :, 1]
-            value = hsv[:, :, 2]
-            
-            high_sat_mask = saturation > 100
-            high_val_mask = value > 150
-            hologram_mask = high_sat_mask & high_val_mask
-            
-            if np.any(hologram_mask):
-                hue_in_hologram = hsv[:, :, 0][hologram_mask]
-                color_variances.append(float(np.var(hue_in_hologram)))
-            else:
-                color_variances.append(0.0)
-        
+    def _analyze_hologram_regions(self, color_variances: list[float]) -> dict[str, Any]:
         change_between_frames = []
         for i in range(1, len(color_variances)):
             change = abs(color_variances[i] - color_variances[i-1])
@@ -139,15 +174,15 @@ class DocumentLivenessAnalyzer:
             "has_hologram_change": avg_change > self.thresholds["hologram_change_min"],
         }
     
-    def _analyze_document_motion(self, frames: list[np.ndarray]) -> dict[str, Any]:
-        if len(frames) < 2:
+    def _analyze_document_motion(self, grays: list[np.ndarray]) -> dict[str, Any]:
+        if len(grays) < 2:
             return {"has_motion": False, "motion_score": 0.0}
         
         motion_scores = []
         
-        for i in range(1, len(frames)):
-            prev_gray = cv2.cvtColor(frames[i-1], cv2.COLOR_BGR2GRAY)
-            curr_gray = cv2.cvtColor(frames[i], cv2.COLOR_BGR2GRAY)
+        for i in range(1, len(grays)):
+            prev_gray = grays[i-1]
+            curr_gray = grays[i]
             
             if prev_gray.shape != curr_gray.shape:
                 curr_gray = cv2.resize(curr_gray, (prev_gray.shape[1], prev_gray.shape[0]))
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+@dataclass
+class ImageContext:
+    """
+    A BGR image plus the color-space conversions the heuristics read from it.
+    Each conversion runs at most once, on the full frame, the first time it is
+    needed; analyzers slice their regions of interest out of it instead of
+    converting every ROI again.
+    """
+    bgr: np.ndarray
+    
+    @property
+    def is_color(self) -> bool:
+        return self.bgr.ndim == 3
+    
+    @cached_property
+    def gray(self) -> np.ndarray:
+        return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY) if self.is_color else self.bgr
+    
+    @cached_property
+    def hsv(self) -> np.ndarray:
+        return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2HSV)
+    
+    @cached_property
+    def ycrcb(self) -> np.ndarray:
+        return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2YCrCb)
@@ -17,7 +17,12 @@ processor = DNIProcessor()
 publisher = DNIPublisher()
 
 
-def handler(event: dict[str, Any], context: Any = None) -> dict[str, Any]:
+def handler(
+    event: dict[str, Any],
+    context: Any = None,
+    *,
+    return_python: bool = False,
+) -> dict[str, Any]:
     safe_event = sanitize_event_for_logging(event)
     logger.info("DNI Worker received event", extra={"event": safe_event})
     
@@ -44,9 +49,10 @@ def handler(event: dict[str, Any], context: Any = None) -> dict[str, Any]:
         result = process_single_document(body, error_handler)
         results.append(result)
     
+    response_body = {"processed": len(results), "results": results}
     return {
         "statusCode": 200,
-        "body": json.dumps({"processed": len(results), "results": results}),
+        "body": response_body if return_python else json.dumps(response_body),
     }
 
 
@@ -8,6 +8,7 @@ logger = get_logger(__name__)
 TARGET_WIDTH = 1200
 CLAHE_CLIP_LIMIT = 2.0
 CLAHE_TILE_SIZE = (8, 8)
+DOCUMENT_EDGE_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
 
 
 def normalize_image(image: np.ndarray) -> np.ndarray:
@@ -112,8 +113,7 @@ def _detect_and_crop_document(image: np.ndarray) -> np.ndarray:
     blurred = cv2.GaussianBlur(gray, (5, 5), 0)
     edges = cv2.Canny(blurred, 30, 100)
     
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-    edges = cv2.dilate(edges, kernel, iterations=2)
+    edges = cv2.dilate(edges, DOCUMENT_EDGE_KERNEL, iterations=2)
     
     contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     
@@ -16,6 +16,7 @@ from kyc_platform.workers.ocr_dni.heuristics import (
     document_liveness_analyzer,
 )
 from kyc_platform.workers.ocr_dni.heuristics.authenticity_analyzer import combined_authenticity_analyzer
+from kyc_platform.workers.ocr_dni.heuristics.image_context import ImageContext
 from kyc_platform.workers.ocr_dni.strategies import (
     DNINewFrontStrategy,
     DNINewBackStrategy,
@@ -98,7 +99,10 @@ class DNIProcessor:
             logger.warning(f"Image normalization failed, using original: {e}")
             normalized = cv_image
         
-        heuristic_result = self._heuristic_analyzer.analyze(normalized)
+        # Gray/HSV/YCrCb of the normalized frame, shared by the heuristic and
+        # authenticity analyzers so each conversion runs once per document.
+        image_context = ImageContext(normalized)
+        heuristic_result = self._heuristic_analyzer.analyze(normalized, context=image_context)
         
         logger.info(
             "Heuristic analysis completed",
@@ -129,6 +133,7 @@ class DNIProcessor:
                 cv_image=normalized,
                 side=side,
                 use_template=True,
+                context=image_context,
             )
             logger.info(
                 "Authenticity analysis completed",
@@ -39,8 +39,10 @@ class DNIUnifiedStrategy(DNIOCRStrategy):
         self._confidence = 0.0
         
         pdf417_fields = self._extract_pdf417(image)
-        mrz_fields = self._extract_mrz(image)
-        ocr_fields = self._extract_ocr(image)
+        # The MRZ needs the English model; the labelled fields are read with
+        # Spanish alone so accented and Ñ characters are recognised as before.
+        mrz_fields = self._extract_mrz(self._ocr_text(image, "spa+eng"))
+        ocr_fields = self._extract_ocr(self._ocr_text(image, "spa"))
         
         merged = self._merge_results(pdf417_fields, mrz_fields, ocr_fields)
         
@@ -150,12 +152,22 @@ class DNIUnifiedStrategy(DNIOCRStrategy):
             return f"{date_str[0:2]}/{date_str[2:4]}/{date_str[4:8]}"
         return date_str
     
-    def _extract_mrz(self, image: Image.Image) -> dict[str, Any]:
+    def _ocr_text(self, image: Image.Image, lang: str) -> Optional[str]:
         if pytesseract is None:
+            return None
+        
+        try:
+            return pytesseract.image_to_string(image, lang=lang)
+        except Exception as e:
+            logger.debug(f"OCR failed: {e}")
+        
+        return None
+    
+    def _extract_mrz(self, text: Optional[str]) -> dict[str, Any]:
+        if not text:
             return {}
         
         try:
-            text = pytesseract.image_to_string(image, lang="spa+eng")
             mrz_result = mrz_parser.extract_mrz_from_text(text)
             
             if mrz_result:
@@ -167,12 +179,11 @@ class DNIUnifiedStrategy(DNIOCRStrategy):
         
         return {}
     
-    def _extract_ocr(self, image: Image.Image) -> dict[str, Any]:
-        if pytesseract is None:
+    def _extract_ocr(self, text: Optional[str]) -> dict[str, Any]:
+        if not text:
             return {}
         
         try:
-            text = pytesseract.image_to_string(image, lang="spa")
             fields = self._parse_ocr_text(text)
             
             if fields:
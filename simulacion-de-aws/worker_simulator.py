@@ -42,7 +42,7 @@ def process_queue(queue, queue_name: str, handler_fn) -> int:
                     "receiptHandle": m.get("receipt_handle", ""),
                     "body": body_str,
                     "attributes": {
-                        "SentTimestamp": m.get("sent_timestamp", ""),
+                        "SentTimestamp": str(m.get("sent_timestamp", "")),
                         "ApproximateReceiveCount": str(m.get("receive_count", 1)),
                     },
                     "messageAttributes": {},